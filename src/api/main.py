@@ -4,8 +4,9 @@
 import contextlib
 import os
 
+import aiohttp
 from azure.ai.projects.aio import AIProjectClient
-from azure.identity import DefaultAzureCredential
+from azure.core.pipeline.transport import AioHttpTransport
 
 import fastapi
 from fastapi.staticfiles import StaticFiles
@@ -13,28 +14,64 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
+from credential_config import create_credential
 from logging_config import configure_logging
 
 enable_trace = False
 logger = None
 
+# Idle keep-alive lifetime for pooled connections to the Azure endpoints.
+# aiohttp drops idle connections after 15s by default, which makes the next
+# request after a short lull pay for a new TLS handshake.
+HTTP_KEEPALIVE_TIMEOUT = 120
+
+# Largest page list_agents accepts (the default page is 20 agents)
+LIST_AGENTS_PAGE_SIZE = 100
+
+# Token scope AIProjectClient authenticates with
+AI_PROJECT_SCOPE = "https://ai.azure.com/.default"
+
+
+def create_http_transport() -> AioHttpTransport:
+    """Create the worker's HTTP transport with a long-lived connection pool."""
+    # Session options mirror the ones azure-core uses for the sessions it owns
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT),
+        trust_env=True,
+        cookie_jar=aiohttp.DummyCookieJar(),
+        auto_decompress=False)
+    return AioHttpTransport(session=session)
+
 
 @contextlib.asynccontextmanager
 async def lifespan(app: fastapi.FastAPI):
     agent = None
+    ai_project = None
+    credential = None
 
     proj_endpoint = os.environ.get("AZURE_EXISTING_AIPROJECT_ENDPOINT")
     agent_id = os.environ.get("AZURE_EXISTING_AGENT_ID")
     try:
+        # One async credential per worker, shared by every request through
+        # ai_project; the sync credential blocked the event loop on each
+        # token refresh.
+        credential = create_credential()
         ai_project = AIProjectClient(
-            credential=DefaultAzureCredential(
-                exclude_shared_token_cache_credential=True),
+            credential=credential,
             endpoint=proj_endpoint,
             # Evaluations yet not supported on stable (api_version="2025-05-01")
-            api_version="2025-05-15-preview"
+            api_version="2025-05-15-preview",
+            transport=create_http_transport()
         )
         logger.info("Created AIProjectClient")
 
+        # Resolve the credential chain and cache the first token now, so the
+        # first request does not pay for credential discovery.
+        try:
+            await credential.get_token(AI_PROJECT_SCOPE)
+        except Exception as e:
+            logger.warning(f"Could not prefetch an access token: {e}")
+
         if enable_trace:
             application_insights_connection_string = ""
             try:
@@ -56,6 +93,8 @@ async def lifespan(app: fastapi.FastAPI):
                 app.state.application_insights_connection_string = application_insights_connection_string
                 logger.info("Configured Application Insights for tracing.")
 
+        # The lifespan runs in each worker after the fork, so fetching the agent
+        # here also opens the worker's pooled connection before the first request.
         if agent_id:
             try:
                 agent = await ai_project.agents.get_agent(agent_id)
@@ -68,7 +107,8 @@ async def lifespan(app: fastapi.FastAPI):
         if not agent:
             # Fallback to searching by name
             agent_name = os.environ["AZURE_AI_AGENT_NAME"]
-            agent_list = ai_project.agents.list_agents()
+            # No server-side name filter; use the largest page to cut round-trips
+            agent_list = ai_project.agents.list_agents(limit=LIST_AGENTS_PAGE_SIZE)
             if agent_list:
                 async for agent_object in agent_list:
                     if agent_object.name == agent_name:
@@ -92,10 +132,16 @@ async def lifespan(app: fastapi.FastAPI):
 
     finally:
         try:
-            await ai_project.close()
-            logger.info("Closed AIProjectClient")
+            if ai_project is not None:
+                await ai_project.close()
+                logger.info("Closed AIProjectClient")
         except Exception as e:
             logger.error("Error closing AIProjectClient", exc_info=True)
+        try:
+            if credential is not None:
+                await credential.close()
+        except Exception:
+            logger.error("Error closing credential", exc_info=True)
 
 
 def create_app():
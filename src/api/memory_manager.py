@@ -7,17 +7,21 @@ context across sessions.
 """
 
 import os
-import json
 import time
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from pathlib import Path
 from azure.ai.agents.models import ThreadMessage
+import orjson
 
 # Set up logging
 logger = logging.getLogger("azureaiapp")
 
+# Number of formatted agent contexts kept per memory manager
+CONTEXT_CACHE_SIZE = 128
+
 
 class MemoryManager:
     """
@@ -25,6 +29,9 @@ class MemoryManager:
     from past conversations to enhance the agent's responses.
     """
 
+    __slots__ = ('storage_path', 'max_memory_items', 'memory_retention_days',
+                 '_context_cache')
+
     def __init__(self, storage_path: Optional[str] = None,
                  max_memory_items: int = 50,
                  memory_retention_days: int = 30):
@@ -40,6 +47,8 @@ class MemoryManager:
             os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'memory'))
         self.max_memory_items = max_memory_items
         self.memory_retention_days = memory_retention_days
+        # (user_id, query) -> (state of the user's files, formatted context)
+        self._context_cache: OrderedDict = OrderedDict()
 
         # Create storage directory if it doesn't exist
         os.makedirs(self.storage_path, exist_ok=True)
@@ -74,19 +83,35 @@ class MemoryManager:
             response: Agent's response.
             metadata: Additional metadata about the interaction.
         """
-        memory_path = self._get_user_memory_path(user_id)
+        self._store_memory_items(user_id, [
+            self._new_memory_item(thread_id, query, response, metadata)])
 
-        # Load existing memories
-        memories = []
-        if os.path.exists(memory_path):
-            try:
-                with open(memory_path, 'r') as f:
-                    memories = json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading memory file: {e}")
+    def store_conversation_memory_bulk(
+            self,
+            records: Iterable[Tuple[str, str, str, str]]) -> None:
+        """
+        Store several memory items, reading and writing each user's file once.
 
-        # Add new memory
-        memory_item = {
+        The result is the same as calling store_conversation_memory for each
+        record in order.
+
+        Args:
+            records: (user_id, thread_id, query, response) tuples.
+        """
+        items_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for user_id, thread_id, query, response in records:
+            items_by_user.setdefault(user_id, []).append(
+                self._new_memory_item(thread_id, query, response))
+
+        for user_id, memory_items in items_by_user.items():
+            self._store_memory_items(user_id, memory_items)
+
+    def _new_memory_item(self,
+                         thread_id: str,
+                         query: str,
+                         response: str,
+                         metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
             "timestamp": datetime.now().isoformat(),
             "thread_id": thread_id,
             "query": query,
@@ -94,8 +119,29 @@ class MemoryManager:
             "metadata": metadata or {}
         }
 
+    def _store_memory_items(self,
+                            user_id: str,
+                            memory_items: List[Dict[str, Any]]) -> None:
+        """
+        Add memory items, oldest first, to the user's memory file.
+
+        Args:
+            user_id: Unique identifier for the user.
+            memory_items: The new memory items in the order they happened.
+        """
+        memory_path = self._get_user_memory_path(user_id)
+
+        # Load existing memories
+        memories = []
+        if os.path.exists(memory_path):
+            try:
+                with open(memory_path, 'rb') as f:
+                    memories = orjson.loads(f.read())
+            except Exception as e:
+                logger.error(f"Error loading memory file: {e}")
+
         # Add to beginning of list (newest first)
-        memories.insert(0, memory_item)
+        memories[:0] = reversed(memory_items)
 
         # Enforce maximum memory size
         if len(memories) > self.max_memory_items:
@@ -107,9 +153,10 @@ class MemoryManager:
         memories = [m for m in memories if m["timestamp"] >= cutoff_date]
 
         # Save updated memories
+        self._context_cache.clear()
         try:
-            with open(memory_path, 'w') as f:
-                json.dump(memories, f, indent=2)
+            with open(memory_path, 'wb') as f:
+                f.write(orjson.dumps(memories))
         except Exception as e:
             logger.error(f"Error saving memory file: {e}")
 
@@ -134,8 +181,8 @@ class MemoryManager:
             return []
 
         try:
-            with open(memory_path, 'r') as f:
-                memories = json.load(f)
+            with open(memory_path, 'rb') as f:
+                memories = orjson.loads(f.read())
         except Exception as e:
             logger.error(f"Error loading memory file: {e}")
             return []
@@ -173,8 +220,8 @@ class MemoryManager:
 
         if os.path.exists(profile_path):
             try:
-                with open(profile_path, 'r') as f:
-                    return json.load(f)
+                with open(profile_path, 'rb') as f:
+                    return orjson.loads(f.read())
             except Exception as e:
                 logger.error(f"Error loading profile: {e}")
 
@@ -189,8 +236,8 @@ class MemoryManager:
         }
 
         try:
-            with open(profile_path, 'w') as f:
-                json.dump(default_profile, f, indent=2)
+            with open(profile_path, 'wb') as f:
+                f.write(orjson.dumps(default_profile))
         except Exception as e:
             logger.error(f"Error saving profile: {e}")
 
@@ -223,20 +270,44 @@ class MemoryManager:
                 profile["topics_of_interest"].append(interaction_data["topic"])
 
         # Save updated profile
+        self._context_cache.clear()
         profile_path = os.path.join(
             self.storage_path, f"{user_id}_profile.json")
         try:
-            with open(profile_path, 'w') as f:
-                json.dump(profile, f, indent=2)
+            with open(profile_path, 'wb') as f:
+                f.write(orjson.dumps(profile))
         except Exception as e:
             logger.error(f"Error saving profile: {e}")
 
+    def _get_context_files_state(self, user_id: str) -> Tuple:
+        """
+        Get the modification time and size of the user's memory and profile.
+
+        Args:
+            user_id: Unique identifier for the user.
+
+        Returns:
+            A tuple that changes whenever either file is written or removed.
+        """
+        state = []
+        for path in (self._get_user_memory_path(user_id),
+                     os.path.join(self.storage_path, f"{user_id}_profile.json")):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
     def format_context_for_agent(self,
                                  user_id: str,
                                  query: str) -> str:
         """
         Format memory and profile data as context for the agent.
 
+        The result is cached per user and query until the user's memory or
+        profile file changes, including changes made by other processes.
+
         Args:
             user_id: Unique identifier for the user.
             query: Current user query.
@@ -244,6 +315,13 @@ class MemoryManager:
         Returns:
             Formatted context string to add to agent prompt.
         """
+        cache_key = (user_id, query)
+        files_state = self._get_context_files_state(user_id)
+        cached = self._context_cache.get(cache_key)
+        if cached is not None and cached[0] == files_state:
+            self._context_cache.move_to_end(cache_key)
+            return cached[1]
+
         relevant_memories = self.get_relevant_memories(user_id, query)
         profile = self.get_user_profile(user_id)
 
@@ -278,4 +356,8 @@ class MemoryManager:
                     f"You responded: {memory['response'][:200]}...")
                 context_parts.append("")  # Empty line between memories
 
-        return "\n".join(context_parts)
+        context = "\n".join(context_parts)
+        self._context_cache[cache_key] = (files_state, context)
+        if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+        return context
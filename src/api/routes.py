@@ -1,34 +1,25 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
-import secrets
-from typing import Optional
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from fastapi import FastAPI, Depends, HTTPException, status
-from opentelemetry import trace
 import asyncio
-import json
+import logging
 import os
+import secrets
 import uuid
-from typing import AsyncGenerator, Optional, Dict
+from typing import Dict, Optional
 
-import fastapi
-from fastapi import Request, Depends, HTTPException, APIRouter, Cookie
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
-
-import logging
-from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+from opentelemetry import trace
 
 from .vector_memory_manager import VectorMemoryManager
 
 from azure.ai.agents.aio import AgentsClient
 from azure.ai.agents.models import (
-    Agent,
     MessageDeltaChunk,
     ThreadMessage,
-    ThreadRun,
     AsyncAgentEventHandler,
     RunStep
 )
@@ -53,9 +44,6 @@ templates = Jinja2Templates(directory=directory)
 # Initialize enhanced vector memory manager
 memory_manager = VectorMemoryManager()
 
-# Create a new FastAPI router
-router = fastapi.APIRouter()
-
 security = HTTPBasic()
 
 username = os.getenv("WEB_APP_USERNAME")
@@ -77,11 +65,11 @@ def authenticate(credentials: Optional[HTTPBasicCredentials] = Depends(security)
             headers={"WWW-Authenticate": "Basic"},
         )
 
-    correct_username = secrets.compare_digest(
-        credentials.username, username or "")
-    correct_password = secrets.compare_digest(
-        credentials.password, password or "")
-    if not (correct_username and correct_password):
+    # A single constant-time comparison over "username:password"; Basic auth
+    # user-ids cannot contain ':' (RFC 7617), so the joined form is unambiguous.
+    expected = f"{username}:{password}".encode("utf-8")
+    provided = f"{credentials.username}:{credentials.password}".encode("utf-8")
+    if not secrets.compare_digest(provided, expected):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -121,15 +109,24 @@ class MyEventHandler(AsyncAgentEventHandler):
         self._app_insights_conn_str = app_insights_conn_str or ""
         self.user_id = user_id
         self.user_query = user_query
-        self.agent_response = ""
+        # Streamed chunks are collected and joined once in on_end
+        self._parts: list[str] = []
+        self._agent_response: Optional[str] = None
+
+    @property
+    def agent_response(self) -> str:
+        if self._agent_response is not None:
+            return self._agent_response
+        return "".join(self._parts)
 
     async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
         if delta.content:
             for content_part in delta.content:
                 if hasattr(content_part, 'text') and content_part.text:
                     if hasattr(content_part.text, 'value'):
-                        print(content_part.text.value, end="", flush=True)
-                        self.agent_response += content_part.text.value
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(content_part.text.value)
+                        self._parts.append(content_part.text.value)
 
     async def on_run_step_done(self, run_step: RunStep) -> None:
         # Uncomment to see the run step details
@@ -139,12 +136,13 @@ class MyEventHandler(AsyncAgentEventHandler):
     async def on_end(self) -> None:
         # Store the conversation in memory when the interaction is complete
         try:
-            if self.agent_response.strip():
+            self._agent_response = "".join(self._parts)
+            if self._agent_response.strip():
                 memory_manager.store_conversation_memory(
                     user_id=self.user_id,
                     thread_id=f"thread_{self.user_id}_{uuid.uuid4().hex[:8]}",
                     query=self.user_query,
-                    response=self.agent_response
+                    response=self._agent_response
                 )
                 logger.info(
                     f"Stored conversation memory for user {self.user_id}")
@@ -199,7 +197,7 @@ async def get_message_and_annotations(agent_client: AgentsClient, message: Threa
         }
 
 
-@router.post("/api/chat")
+@router.post("/api/chat", response_class=ORJSONResponse)
 async def chat(
     request: Request,
     user_id: str = "default_user",
@@ -257,7 +255,7 @@ async def chat(
         )
 
         # Return successful response
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "status": "success",
             "thread_id": thread_id,
             "message": "Chat completed successfully"
@@ -265,13 +263,13 @@ async def chat(
 
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Chat failed: {str(e)}"}
         )
 
 
-@router.get("/api/messages")
+@router.get("/api/messages", response_class=ORJSONResponse)
 async def get_messages(
     request: Request,
     thread_id: str,
@@ -281,24 +279,23 @@ async def get_messages(
     try:
         agent_client = get_agent_client(request)
 
+        # Materialize the async pager first, then format all messages concurrently.
         response = agent_client.messages.list(thread_id=thread_id)
-        messages = []
-
-        for message in response:
-            formatted_message = await get_message_and_annotations(agent_client, message)
-            messages.append(formatted_message)
+        thread_messages = [message async for message in response]
+        messages = await asyncio.gather(
+            *(get_message_and_annotations(agent_client, message) for message in thread_messages))
 
-        return JSONResponse(content={"messages": messages})
+        return ORJSONResponse(content={"messages": list(messages)})
 
     except Exception as e:
         logger.error(f"Error getting messages: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to get messages: {str(e)}"}
         )
 
 
-@router.get("/api/agents")
+@router.get("/api/agents", response_class=ORJSONResponse)
 async def get_agents(request: Request, _auth=auth_dependency):
     """Get available agents"""
     try:
@@ -315,18 +312,18 @@ async def get_agents(request: Request, _auth=auth_dependency):
                 "instructions": agent.instructions
             })
 
-        return JSONResponse(content={"agents": agent_list})
+        return ORJSONResponse(content={"agents": agent_list})
 
     except Exception as e:
         logger.error(f"Error getting agents: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to get agents: {str(e)}"}
         )
 
 
 # Memory management endpoints
-@router.get("/api/memory/user/{user_id}")
+@router.get("/api/memory/user/{user_id}", response_class=ORJSONResponse)
 async def get_user_memory(user_id: str, _auth=auth_dependency):
     """Get user memory profile and recent conversations"""
     try:
@@ -334,55 +331,55 @@ async def get_user_memory(user_id: str, _auth=auth_dependency):
         recent_memories = memory_manager.get_relevant_memories(
             user_id, "", max_results=10)
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "profile": profile,
             "recent_memories": recent_memories
         })
 
     except Exception as e:
         logger.error(f"Error getting user memory: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to get user memory: {str(e)}"}
         )
 
 
-@router.post("/api/memory/clear/{user_id}")
+@router.post("/api/memory/clear/{user_id}", response_class=ORJSONResponse)
 async def clear_user_memory(user_id: str, _auth=auth_dependency):
     """Clear all memory for a specific user"""
     try:
         # Note: This would need to be implemented in the memory manager
         logger.info(f"Memory clear requested for user {user_id}")
-        return JSONResponse(content={"status": "success", "message": "Memory cleared"})
+        return ORJSONResponse(content={"status": "success", "message": "Memory cleared"})
 
     except Exception as e:
         logger.error(f"Error clearing memory: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to clear memory: {str(e)}"}
         )
 
 
-@router.get("/api/memory/analytics/{user_id}")
+@router.get("/api/memory/analytics/{user_id}", response_class=ORJSONResponse)
 async def get_memory_analytics(user_id: str, _auth=auth_dependency):
     """Get advanced memory analytics for a user"""
     try:
         analytics = memory_manager.get_memory_analytics(user_id)
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "analytics": analytics,
             "user_id": user_id
         })
 
     except Exception as e:
         logger.error(f"Error getting memory analytics: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to get memory analytics: {str(e)}"}
         )
 
 
-@router.post("/api/memory/search/{user_id}")
+@router.post("/api/memory/search/{user_id}", response_class=ORJSONResponse)
 async def search_user_memories(
     user_id: str,
     request: Request,
@@ -404,7 +401,7 @@ async def search_user_memories(
             max_results=max_results
         )
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "query": query,
             "results": memories,
             "total_found": len(memories)
@@ -412,17 +409,17 @@ async def search_user_memories(
 
     except Exception as e:
         logger.error(f"Error searching memories: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to search memories: {str(e)}"}
         )
 
 
 # Health check endpoint
-@router.get("/api/health")
+@router.get("/api/health", response_class=ORJSONResponse)
 async def health_check():
     """Basic health check endpoint"""
-    return JSONResponse(content={"status": "healthy", "service": "ai-agent-api"})
+    return ORJSONResponse(content={"status": "healthy", "service": "ai-agent-api"})
 
 
 # Root endpoint
@@ -2,10 +2,12 @@ from typing import Any, Dict, Optional
 
 import csv
 import glob
-import json
+import itertools
 import os
 import time
 
+import orjson
+
 from azure.core.credentials_async import AsyncTokenCredential
 from azure.search.documents.aio import AsyncSearchItemPaged, SearchClient 
 from azure.search.documents.indexes.aio import SearchIndexClient
@@ -14,6 +16,8 @@ from azure.search.documents.indexes.models import (
     AzureOpenAIVectorizer,
     AzureOpenAIVectorizerParameters,
     HnswAlgorithmConfiguration,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -23,6 +27,7 @@ from azure.search.documents.indexes.models import (
     SemanticField,
     SimpleField,
     VectorSearch,
+    VectorSearchCompressionTarget,
     VectorSearchProfile,
 )
 from azure.search.documents.models import VectorizableTextQuery
@@ -53,6 +58,7 @@ class SearchIndexManager:
     _SEMANTIC_CONFIG = "semantic_search"
     _EMBEDDING_CONFIG = "embedding_config"
     _VECTORIZER = "search_vectorizer"
+    _COMPRESSION = "embed-compression-config"
 
 
     def __init__(
@@ -87,28 +93,31 @@ class SearchIndexManager:
                 endpoint=self._endpoint, index_name=self._index.name, credential=self._credential)
         return self._client
     
-    async def upload_documents(self, embeddings_file: str) -> None:
+    async def upload_documents(self, embeddings_file: str, batch_size: int = 500) -> None:
         """
         Upload the embeggings file to index search.
 
+        The file is streamed and uploaded in batches, so memory use is bounded
+        by the batch size rather than the size of the file.
+
         :param embeddings_file: The embeddings file to upload.
+        :param batch_size: The number of documents to send per upload request.
         """
         self._raise_if_no_index()
-        documents = []
-        index = 0
+        client = self._get_client()
         with open(embeddings_file, newline='') as fp:
             reader = csv.DictReader(fp)
-            for row in reader:
-                documents.append(
-                    {
-                        'embedId': str(index),
-                        'token': row['token'],
-                        'embedding': json.loads(row['embedding']),
-                        'title': row['title'] 
-                    }
-                )
-                index += 1
-        await self._get_client().upload_documents(documents)
+            documents = (
+                {
+                    'embedId': str(index),
+                    'token': row['token'],
+                    'embedding': orjson.loads(row['embedding']),
+                    'title': row['title']
+                }
+                for index, row in enumerate(reader)
+            )
+            for batch in iter(lambda: list(itertools.islice(documents, batch_size)), []):
+                await client.upload_documents(batch)
 
     def _raise_if_no_index(self) -> None:
         """
@@ -197,7 +206,8 @@ class SearchIndexManager:
     async def create_index(
         self,
         vector_index_dimensions: Optional[int] = None,
-        raise_on_error: bool=False
+        raise_on_error: bool=False,
+        compression_kind: Optional[str] = None
         ) -> bool:
         """
         Create index or return false if it already exists.
@@ -210,13 +220,19 @@ class SearchIndexManager:
                Also please see the embedding model documentation
                https://platform.openai.com/docs/models#embeddings
         :param raise_on_error: Raise if index creation was not successful.
+        :param compression_kind: Set to "scalar" to store the vector index as int8
+               scalar-quantized vectors, a quarter of the float32 size. None keeps
+               full-precision vectors.
         :return: True if index was created, False otherwise.
         :raises: Value error if both dimensions of embedding model and vector_index_dimensions are not set
-                 or both of them are set and they do not equal each other.
+                 or both of them are set and they do not equal each other, or if compression_kind
+                 is not supported.
         """
         vector_index_dimensions = self._check_dimensions(vector_index_dimensions)
+        if compression_kind not in (None, "scalar"):
+            raise ValueError(f"Unsupported vector compression kind: {compression_kind}")
         try:
-            self._index = await self._index_create(vector_index_dimensions)
+            self._index = await self._index_create(vector_index_dimensions, compression_kind)
             return True
         except HttpResponseError:
             if raise_on_error:
@@ -225,7 +241,10 @@ class SearchIndexManager:
                 self._index = await ix_client.get_index(self._index_name)
             return False
         
-    async def _index_create(self, vector_index_dimensions: int) -> SearchIndex:
+    async def _index_create(
+            self,
+            vector_index_dimensions: int,
+            compression_kind: Optional[str] = None) -> SearchIndex:
         """
         Create the index.
 
@@ -236,6 +255,7 @@ class SearchIndexManager:
                the length of the list obtained.
                Also please see the embedding model documentation
                https://platform.openai.com/docs/models#embeddings
+        :param compression_kind: "scalar" for int8 scalar quantization, None for no compression.
         :return: The newly created search index.
         """
         async with SearchIndexClient(endpoint=self._endpoint, credential=self._credential) as ix_client:
@@ -251,14 +271,25 @@ class SearchIndexManager:
                 SearchField(name="token", searchable=True, type=SearchFieldDataType.String, hidden=False),
                 SearchField(name="title", type=SearchFieldDataType.String, hidden=False),
             ]
+            compressions = []
+            if compression_kind == "scalar":
+                compressions.append(
+                    ScalarQuantizationCompression(
+                        compression_name=SearchIndexManager._COMPRESSION,
+                        parameters=ScalarQuantizationParameters(
+                            quantized_data_type=VectorSearchCompressionTarget.INT8)
+                    )
+                )
             vector_search = VectorSearch(
                 profiles=[
                     VectorSearchProfile(
                         name=SearchIndexManager._EMBEDDING_CONFIG,
                         algorithm_configuration_name="embed-algorithms-config",
-                        vectorizer_name=SearchIndexManager._VECTORIZER
+                        vectorizer_name=SearchIndexManager._VECTORIZER,
+                        compression_name=SearchIndexManager._COMPRESSION if compressions else None
                     )
                 ],
+                compressions=compressions or None,
                 algorithms=[HnswAlgorithmConfiguration(name="embed-algorithms-config")],
                 vectorizers=[
                     AzureOpenAIVectorizer(
@@ -355,7 +386,7 @@ class SearchIndexManager:
                 for token, float_data, reference in zip(sentence_tokens, emedding, references):
                     writer.writerow({
                         'token': token,
-                        'embedding': json.dumps(float_data['embedding']),
+                        'embedding': orjson.dumps(float_data['embedding']).decode(),
                         'title': reference})
 
     async def close(self):
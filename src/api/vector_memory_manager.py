@@ -4,17 +4,56 @@ Improves memory relevance matching using text embeddings.
 """
 
 import os
-import json
+import re
+import orjson
+import heapq
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer
+
+try:
+    import faiss
+except ImportError:
+    # FAISS is optional; without it similarity falls back to a numpy matvec.
+    faiss = None
 
 logger = logging.getLogger(__name__)
 
+# Dimension of the hashed document vectors. They are densified for the FAISS
+# index, so this stays close to the former TF-IDF max_features cap.
+EMBEDDING_DIM = 2 ** 12
+
+# Stored embeddings are non-negative unit vectors, so every component lies in
+# [0, 1] and is kept as an 8-bit code on a fixed 1/255 grid.
+EMBEDDING_SCALE = 255
+
+# On-disk embedding snapshot: each row's codes next to a key of the memory
+# text it embeds. Workers append to the shared log and save their own
+# snapshots, so rows are only trusted while their keys match the log.
+_SNAPSHOT_DTYPE = np.dtype([('key', np.uint64),
+                            ('codes', np.uint8, (EMBEDDING_DIM,))])
+
+# Common topic keywords
+TOPIC_KEYWORDS = {
+    'technical': ['api', 'code', 'programming', 'development', 'software'],
+    'product': ['features', 'specifications', 'capabilities', 'functions'],
+    'support': ['help', 'issue', 'problem', 'error', 'troubleshoot'],
+    'information': ['what', 'how', 'when', 'where', 'why', 'explain'],
+    'configuration': ['setup', 'config', 'settings', 'install', 'configure']
+}
+
+# One alternation per topic, anchored at word starts so that e.g. "config"
+# still matches "configuration" but "api" no longer matches "rapid".
+_TOPIC_PATTERNS = {
+    topic: re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + ')')
+    for topic, keywords in TOPIC_KEYWORDS.items()
+}
+
 
 class VectorMemoryManager:
     """Enhanced memory manager with vector-based similarity search."""
@@ -39,17 +78,50 @@ class VectorMemoryManager:
         self.memory_retention_days = memory_retention_days
         self.similarity_threshold = similarity_threshold
 
-        # Initialize TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+        # Stateless hashing vectorizer: there is no vocabulary to fit, so stored
+        # document vectors stay valid as memories are added. Rows are L2-normalized.
+        # Unigrams only: without IDF weighting, bigrams mostly dilute the norm.
+        self.vectorizer = HashingVectorizer(
+            n_features=EMBEDDING_DIM,
             stop_words='english',
-            ngram_range=(1, 2),
-            lowercase=True
+            ngram_range=(1, 1),
+            lowercase=True,
+            alternate_sign=False,
+            norm='l2'
         )
 
         # Cache for user memories to avoid repeated file reads
         self._memory_cache = {}
-        self._vectorizer_fitted = False
+
+        # Per-user FAISS inner-product indexes over the document vectors
+        self._faiss_index: Dict[str, Any] = {}
+
+        # Shared GPU resources when a CUDA build of FAISS sees a device
+        self._faiss_gpu_resources = None
+        if faiss is not None and faiss.get_num_gpus() > 0:
+            self._faiss_gpu_resources = faiss.StandardGpuResources()
+
+        # Per-user document embedding matrices, row-aligned with the memory log,
+        # and the memory key of each row
+        self._doc_matrix_cache: Dict[str, np.ndarray] = {}
+        self._doc_keys_cache: Dict[str, np.ndarray] = {}
+
+        # Single worker so embedding snapshots are written in order
+        self._persist_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="memory-persist")
+
+        # Per-user profiles, written through to profile.json on update, with
+        # the file state they were read at. Other workers write the same file,
+        # so an entry is only reused while profile.json is unchanged.
+        self._profile_cache: Dict[str, Tuple[Optional[Tuple[int, int]],
+                                             Dict[str, Any]]] = {}
+
+        # Per-user token sets for the keyword fallback, aligned with memories.
+        # Populated alongside _memory_cache.
+        self._token_sets_cache: Dict[str, List[frozenset]] = {}
+
+        # User directories already created by this process
+        self._user_dirs = set()
 
         # Create storage directory if it doesn't exist
         os.makedirs(self.storage_path, exist_ok=True)
@@ -57,19 +129,26 @@ class VectorMemoryManager:
     def _get_user_memory_path(self, user_id: str) -> str:
         """Get the path to the user's memory directory."""
         user_dir = os.path.join(self.storage_path, 'users', user_id)
-        os.makedirs(user_dir, exist_ok=True)
+        if user_dir not in self._user_dirs:
+            os.makedirs(user_dir, exist_ok=True)
+            self._user_dirs.add(user_dir)
         return user_dir
 
     def _get_user_profile_path(self, user_id: str) -> str:
         """Get the path to the user's profile file."""
         return os.path.join(self._get_user_memory_path(user_id), 'profile.json')
 
+    def _get_memory_log_path(self, user_id: str) -> str:
+        """Get the path to the user's append-only memory log."""
+        return os.path.join(self._get_user_memory_path(user_id), 'memories.jsonl')
+
+    def _get_embeddings_path(self, user_id: str) -> str:
+        """Get the path to the user's persisted embedding matrix."""
+        return os.path.join(self._get_user_memory_path(user_id), 'embeddings.npy')
+
     def _get_conversations_path(self, user_id: str) -> str:
-        """Get the path to the user's conversations directory."""
-        conversations_dir = os.path.join(
-            self._get_user_memory_path(user_id), 'conversations')
-        os.makedirs(conversations_dir, exist_ok=True)
-        return conversations_dir
+        """Get the path to the user's legacy per-thread conversations directory."""
+        return os.path.join(self._get_user_memory_path(user_id), 'conversations')
 
     def _load_user_memories(self, user_id: str) -> List[Dict[str, Any]]:
         """Load all memories for a specific user."""
@@ -77,47 +156,90 @@ class VectorMemoryManager:
             return self._memory_cache[user_id]
 
         memories = []
-        conversations_path = self._get_conversations_path(user_id)
-
         try:
-            for filename in os.listdir(conversations_path):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(conversations_path, filename)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        conversation_data = json.load(f)
-                        memories.extend(conversation_data.get('memories', []))
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"Error loading memories for user {user_id}: {e}")
+            with open(self._get_memory_log_path(user_id), 'rb') as f:
+                lines = f.read().splitlines()
+            for line in lines:
+                if not line:
+                    continue
+                try:
+                    memories.append(orjson.loads(line))
+                except orjson.JSONDecodeError as e:
+                    logger.warning(f"Skipping corrupt memory entry for user {user_id}: {e}")
+        except FileNotFoundError:
+            memories = self._migrate_conversation_files(user_id)
+
+        # Token sets are persisted with each entry but kept out of the memory dicts
+        token_sets = []
+        for memory in memories:
+            tokens = memory.pop('_tokens', None)
+            token_sets.append(frozenset(tokens) if tokens is not None
+                              else self._memory_tokens(memory))
 
         # Cache the memories
         self._memory_cache[user_id] = memories
+        self._token_sets_cache[user_id] = token_sets
         return memories
 
-    def _prepare_text_corpus(self, user_id: str) -> List[str]:
-        """Prepare text corpus for vectorization."""
-        memories = self._load_user_memories(user_id)
-        corpus = []
+    def _migrate_conversation_files(self, user_id: str) -> List[Dict[str, Any]]:
+        """Fold legacy per-thread conversation files into the user's memory log."""
+        memories = []
+        try:
+            entries = os.scandir(self._get_conversations_path(user_id))
+        except FileNotFoundError:
+            return memories
 
-        for memory in memories:
-            # Combine query and response for better context
-            text = f"{memory.get('query', '')} {memory.get('response', '')}"
-            corpus.append(text.strip())
+        with entries:
+            paths = [entry.path for entry in entries
+                     if entry.name.endswith('.json') and entry.is_file()]
 
-        return corpus
+        # File reads release the GIL, so a small pool overlaps their latency
+        with ThreadPoolExecutor(max_workers=min(8, len(paths) or 1)) as executor:
+            for thread_memories in executor.map(self._read_conversation_file, paths):
+                memories.extend(thread_memories)
 
-    def _fit_vectorizer_if_needed(self, user_id: str):
-        """Fit the vectorizer with user's memory corpus if not already fitted."""
-        if not self._vectorizer_fitted or user_id not in self._memory_cache:
-            corpus = self._prepare_text_corpus(user_id)
+        if memories:
+            for memory in memories:
+                memory['_tokens'] = list(self._memory_tokens(memory))
+            with open(self._get_memory_log_path(user_id), 'wb') as f:
+                f.write(b''.join(orjson.dumps(m, option=orjson.OPT_APPEND_NEWLINE)
+                                 for m in memories))
+            logger.info(f"Migrated {len(memories)} memories for user {user_id} to memory log")
 
-            if corpus:  # Only fit if we have data
-                try:
-                    self.vectorizer.fit(corpus)
-                    self._vectorizer_fitted = True
-                    logger.info(
-                        f"Vectorizer fitted with {len(corpus)} documents for user {user_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to fit vectorizer: {e}")
+        return memories
+
+    @staticmethod
+    def _read_conversation_file(file_path: str) -> List[Dict[str, Any]]:
+        """Read the memories from one legacy per-thread conversation file."""
+        try:
+            with open(file_path, 'rb') as f:
+                conversation_data = orjson.loads(f.read())
+            return conversation_data.get('memories', [])
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Error loading memories from {file_path}: {e}")
+            return []
+
+    @staticmethod
+    def _memory_text(memory: Dict[str, Any]) -> str:
+        """Combine query and response for better context."""
+        return f"{memory.get('query', '')} {memory.get('response', '')}".strip()
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Vectorize texts into a contiguous float32 matrix, one row per text."""
+        return np.ascontiguousarray(
+            self.vectorizer.transform(texts).toarray(), dtype=np.float32)
+
+    @classmethod
+    def _memory_key(cls, memory: Dict[str, Any]) -> int:
+        """64-bit key of the text a memory's embedding is computed from."""
+        return int.from_bytes(
+            hashlib.blake2b(cls._memory_text(memory).encode(), digest_size=8).digest(),
+            'little')
+
+    @staticmethod
+    def _quantize(vectors: np.ndarray) -> np.ndarray:
+        """Quantize float embeddings to uint8 codes for storage."""
+        return np.rint(vectors * EMBEDDING_SCALE).astype(np.uint8)
 
     def store_conversation_memory(self,
                                   user_id: str,
@@ -138,9 +260,12 @@ class VectorMemoryManager:
         """
         try:
             # Create memory item
+            now = datetime.now()
             memory_item = {
-                "id": hashlib.md5(f"{user_id}_{thread_id}_{query}".encode()).hexdigest(),
-                "timestamp": datetime.now().isoformat(),
+                "id": hashlib.blake2b(f"{user_id}_{thread_id}_{query}".encode(),
+                                      digest_size=16).hexdigest(),
+                "timestamp": now.isoformat(),
+                "timestamp_epoch": now.timestamp(),
                 "thread_id": thread_id,
                 "query": query.strip(),
                 "response": response.strip(),
@@ -149,30 +274,23 @@ class VectorMemoryManager:
                 "topics": self._extract_topics(query, response)
             }
 
-            # Get conversation file path
-            conversations_path = self._get_conversations_path(user_id)
-            thread_file = os.path.join(conversations_path, f"{thread_id}.json")
-
-            # Load existing conversation or create new
-            conversation_data = {"thread_id": thread_id, "memories": []}
-            if os.path.exists(thread_file):
-                with open(thread_file, 'r', encoding='utf-8') as f:
-                    conversation_data = json.load(f)
+            # Load first so the cache (and any legacy migration) is current
+            memories = self._load_user_memories(user_id)
 
-            # Add new memory
-            conversation_data["memories"].append(memory_item)
+            # Append to the user's memory log, with its keyword-search tokens
+            tokens = self._memory_tokens(memory_item)
+            with open(self._get_memory_log_path(user_id), 'ab') as f:
+                f.write(orjson.dumps({**memory_item, "_tokens": list(tokens)},
+                                     option=orjson.OPT_APPEND_NEWLINE))
 
-            # Save conversation
-            with open(thread_file, 'w', encoding='utf-8') as f:
-                json.dump(conversation_data, f, indent=2, ensure_ascii=False)
+            # Keep the cached memories, tokens and vectors in sync
+            memories.append(memory_item)
+            self._token_sets_cache[user_id].append(tokens)
+            self._add_document_vector(user_id, memory_item)
 
             # Update user profile
             self._update_user_interaction(user_id, query, response)
 
-            # Clear cache to force reload
-            if user_id in self._memory_cache:
-                del self._memory_cache[user_id]
-
             logger.info(
                 f"Stored memory for user {user_id}, thread {thread_id}")
             return True
@@ -196,113 +314,268 @@ class VectorMemoryManager:
         Returns:
             List of relevant memories ordered by similarity score.
         """
-        try:
-            # Load user memories
-            memories = self._load_user_memories(user_id)
+        return self.get_relevant_memories_batch(user_id, [query], max_results)[0]
 
-            if not memories or not query.strip():
-                return []
+    def get_relevant_memories_batch(self,
+                                    user_id: str,
+                                    queries: List[str],
+                                    max_results: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant memories for several queries at once.
 
-            # Prepare corpus for vectorization
-            self._fit_vectorizer_if_needed(user_id)
+        The queries are embedded together and scored against the user's
+        memories in one matrix product (or one FAISS search).
 
-            if not self._vectorizer_fitted:
-                # Fallback to keyword-based search
-                return self._keyword_based_search(memories, query, max_results)
+        Args:
+            user_id: Unique identifier for the user.
+            queries: User queries to find relevant memories for.
+            max_results: Maximum number of relevant memories to return per query.
 
-            # Prepare documents
-            documents = []
-            for memory in memories:
-                doc_text = f"{memory.get('query', '')} {memory.get('response', '')}"
-                documents.append(doc_text.strip())
+        Returns:
+            One list of relevant memories per query, ordered by similarity score.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        try:
+            # Load user memories
+            memories = self._load_user_memories(user_id)
 
-            if not documents:
-                return []
+            positions = [i for i, query in enumerate(queries) if query.strip()]
+            if not memories or not positions:
+                return results
 
-            # Vectorize documents and query
+            # Vectorize queries and rank documents
             try:
-                doc_vectors = self.vectorizer.transform(documents)
-                query_vector = self.vectorizer.transform([query])
-
-                # Calculate similarity scores
-                similarity_scores = cosine_similarity(
-                    query_vector, doc_vectors).flatten()
+                query_vectors = self._embed([queries[i] for i in positions])
 
-                # Get relevant memories above threshold
-                relevant_indices = []
-                for i, score in enumerate(similarity_scores):
-                    if score >= self.similarity_threshold:
-                        relevant_indices.append((i, score))
-
-                # Sort by similarity score (descending)
-                relevant_indices.sort(key=lambda x: x[1], reverse=True)
+                if faiss is not None:
+                    ranked_batch = self._search_faiss_index(
+                        user_id, query_vectors, max_results)
+                else:
+                    ranked_batch = self._search_dense(
+                        user_id, query_vectors, max_results)
 
                 # Return top results
-                results = []
-                for i, score in relevant_indices[:max_results]:
-                    memory = memories[i].copy()
-                    memory['similarity_score'] = float(score)
-                    results.append(memory)
+                for position, ranked in zip(positions, ranked_batch):
+                    for i, score in ranked:
+                        memory = memories[i].copy()
+                        memory['similarity_score'] = float(score)
+                        results[position].append(memory)
 
                 logger.info(
-                    f"Found {len(results)} relevant memories for user {user_id}")
+                    f"Found {sum(map(len, results))} relevant memories for user {user_id}")
                 return results
 
             except Exception as e:
                 logger.warning(
                     f"Vector search failed, falling back to keyword search: {e}")
-                return self._keyword_based_search(memories, query, max_results)
+                for position in positions:
+                    results[position] = self._keyword_based_search(
+                        user_id, memories, queries[position], max_results)
+                return results
 
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}")
-            return []
+            return [[] for _ in queries]
+
+    def _add_document_vector(self, user_id: str, memory: Dict[str, Any]):
+        """Append a new memory's embedding to the user's matrix and index, if loaded."""
+        doc_matrix = self._doc_matrix_cache.get(user_id)
+        if doc_matrix is None:
+            return
+
+        codes = self._quantize(self._embed([self._memory_text(memory)]))
+        doc_matrix = np.concatenate((doc_matrix, codes))
+        doc_keys = np.append(self._doc_keys_cache[user_id],
+                             np.uint64(self._memory_key(memory)))
+        self._doc_matrix_cache[user_id] = doc_matrix
+        self._doc_keys_cache[user_id] = doc_keys
+        self._schedule_embeddings_save(user_id, doc_matrix, doc_keys)
+
+        index = self._faiss_index.get(user_id)
+        if index is not None:
+            # Add the dequantized codes, as a rebuild does, so scores match
+            index.add(codes.astype(np.float32) / EMBEDDING_SCALE)
+
+    def _get_doc_matrix(self, user_id: str) -> np.ndarray:
+        """Get the user's quantized embedding matrix, loading or computing it if needed."""
+        doc_matrix = self._doc_matrix_cache.get(user_id)
+        if doc_matrix is not None:
+            return doc_matrix
 
-    def _keyword_based_search(self, memories: List[Dict], query: str, max_results: int) -> List[Dict]:
+        memories = self._load_user_memories(user_id)
+        memory_keys = np.fromiter((self._memory_key(m) for m in memories),
+                                  dtype=np.uint64, count=len(memories))
+        try:
+            # Memory-mapped read-only, so worker processes share the page cache.
+            # Snapshots are replaced atomically, never written in place.
+            snapshot = np.load(self._get_embeddings_path(user_id), mmap_mode='r')
+        except FileNotFoundError:
+            snapshot = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable embeddings for user {user_id}: {e}")
+            snapshot = None
+
+        if (snapshot is None or snapshot.dtype != _SNAPSHOT_DTYPE
+                or snapshot.ndim != 1):
+            snapshot = np.empty(0, dtype=_SNAPSHOT_DTYPE)
+
+        # Keep the leading rows that embed the same memories as the log. Another
+        # worker may have saved a snapshot of a different order or subset.
+        snapshot_keys = np.asarray(snapshot['key'][:len(memory_keys)])
+        mismatches = np.flatnonzero(snapshot_keys != memory_keys[:len(snapshot_keys)])
+        valid_rows = mismatches[0] if len(mismatches) else len(snapshot_keys)
+        doc_matrix = snapshot['codes'][:valid_rows]
+
+        # Memories past the valid rows are embedded in one batch
+        if valid_rows < len(memories):
+            missing = [self._memory_text(m) for m in memories[valid_rows:]]
+            doc_matrix = np.concatenate(
+                (doc_matrix, self._quantize(self._embed(missing))))
+        if valid_rows < len(memories) or valid_rows < len(snapshot):
+            self._schedule_embeddings_save(user_id, doc_matrix, memory_keys)
+
+        self._doc_matrix_cache[user_id] = doc_matrix
+        self._doc_keys_cache[user_id] = memory_keys
+        return doc_matrix
+
+    def _schedule_embeddings_save(self, user_id: str, doc_matrix: np.ndarray,
+                                  doc_keys: np.ndarray):
+        """Persist the embedding matrix and its row keys in the background."""
+        self._persist_executor.submit(
+            self._save_embeddings, self._get_embeddings_path(user_id),
+            doc_matrix, doc_keys)
+
+    @staticmethod
+    def _save_embeddings(path: str, doc_matrix: np.ndarray, doc_keys: np.ndarray):
+        """Atomically write an embedding matrix and its row keys to disk."""
+        snapshot = np.empty(len(doc_matrix), dtype=_SNAPSHOT_DTYPE)
+        snapshot['key'] = doc_keys
+        snapshot['codes'] = doc_matrix
+        # Unique per process and persist thread, so concurrent writers (other
+        # gunicorn workers, other managers) never share a tmp file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, snapshot)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist embeddings to {path}: {e}")
+
+    def _get_faiss_index(self, user_id: str):
+        """Get the user's FAISS index, building it from the embedding matrix if needed."""
+        index = self._faiss_index.get(user_id)
+        if index is None:
+            doc_matrix = self._get_doc_matrix(user_id)
+            index = self._new_faiss_index()
+            index.add(doc_matrix.astype(np.float32) / EMBEDDING_SCALE)
+            self._faiss_index[user_id] = index
+        return index
+
+    def _new_faiss_index(self):
+        """Create an empty inner-product index, on the GPU when one is available."""
+        # Rows are already L2-normalized, so inner product == cosine
+        if self._faiss_gpu_resources is not None:
+            try:
+                return faiss.index_cpu_to_gpu(
+                    self._faiss_gpu_resources, 0, faiss.IndexFlatIP(EMBEDDING_DIM))
+            except Exception as e:
+                logger.warning(f"GPU FAISS index unavailable, using CPU: {e}")
+                self._faiss_gpu_resources = None
+
+        # The 8-bit uniform quantizer is fixed to [0, 1] rather than data-trained
+        index = faiss.IndexScalarQuantizer(
+            EMBEDDING_DIM, faiss.ScalarQuantizer.QT_8bit_uniform,
+            faiss.METRIC_INNER_PRODUCT)
+        index.train(np.stack((np.zeros(EMBEDDING_DIM, dtype=np.float32),
+                              np.ones(EMBEDDING_DIM, dtype=np.float32))))
+        return index
+
+    def _search_faiss_index(self, user_id: str, query_vectors: np.ndarray,
+                            max_results: int) -> List[List[Tuple[int, float]]]:
+        """Return (memory index, score) pairs above the threshold per query using FAISS."""
+        index = self._get_faiss_index(user_id)
+        k = min(max_results, index.ntotal)
+        if k <= 0:
+            return [[] for _ in query_vectors]
+        scores, indices = index.search(query_vectors, k)
+
+        # FAISS returns results ordered by descending score
+        return [[(int(i), score) for i, score in zip(row_indices, row_scores)
+                 if i >= 0 and score >= self.similarity_threshold]
+                for row_indices, row_scores in zip(indices, scores)]
+
+    def _search_dense(self, user_id: str, query_vectors: np.ndarray,
+                      max_results: int) -> List[List[Tuple[int, float]]]:
+        """Return (memory index, score) pairs above the threshold per query using numpy."""
+        doc_codes = self._get_doc_matrix(user_id)
+        # Rows are L2-normalized, so the product yields cosine similarity. Only
+        # the hashed columns some query uses contribute, so only those are read.
+        columns = np.flatnonzero(query_vectors.any(axis=0))
+        similarity_matrix = (
+            doc_codes[:, columns] @ query_vectors[:, columns].T) / EMBEDDING_SCALE
+
+        ranked_batch = []
+        for similarity_scores in similarity_matrix.T:
+            # Threshold and select the top k in numpy, then order just those k
+            candidates = np.flatnonzero(similarity_scores >= self.similarity_threshold)
+            if len(candidates) > max_results > 0:
+                top_k = np.argpartition(-similarity_scores[candidates], max_results - 1)
+                candidates = candidates[top_k[:max_results]]
+            candidates = candidates[np.argsort(-similarity_scores[candidates])][:max_results]
+            ranked_batch.append([(int(i), similarity_scores[i]) for i in candidates])
+        return ranked_batch
+
+    @staticmethod
+    def _memory_tokens(memory: Dict[str, Any]) -> frozenset:
+        """Lowercased word set of a memory's query and response."""
+        return frozenset(
+            f"{memory.get('query', '')} {memory.get('response', '')}".lower().split())
+
+    def _keyword_based_search(self, user_id: str, memories: List[Dict], query: str,
+                              max_results: int) -> List[Dict]:
         """Fallback keyword-based search when vector search fails."""
-        query_words = set(query.lower().split())
-        scored_memories = []
+        token_sets = self._token_sets_cache[user_id]
+        query_words = frozenset(query.lower().split())
 
-        for memory in memories:
-            memory_text = f"{memory.get('query', '')} {memory.get('response', '')}".lower(
-            )
-            memory_words = set(memory_text.split())
-
-            # Simple keyword overlap score
-            overlap = len(query_words.intersection(memory_words))
-            if overlap > 0:
-                score = overlap / len(query_words.union(memory_words))
-                memory_copy = memory.copy()
-                memory_copy['similarity_score'] = score
-                scored_memories.append(memory_copy)
-
-        # Sort by score and return top results
-        scored_memories.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return scored_memories[:max_results]
+        # Jaccard overlap score for every memory sharing at least one word
+        scores = [(len(query_words & tokens) / len(query_words | tokens), i)
+                  for i, tokens in enumerate(token_sets) if query_words & tokens]
+
+        scored_memories = []
+        for score, i in heapq.nlargest(max_results, scores):
+            memory_copy = memories[i].copy()
+            memory_copy['similarity_score'] = score
+            scored_memories.append(memory_copy)
+        return scored_memories
 
     def _extract_topics(self, query: str, response: str) -> List[str]:
         """Extract potential topics from query and response."""
         # Simple topic extraction - could be enhanced with NLP
         text = f"{query} {response}".lower()
 
-        # Common topic keywords
-        topic_keywords = {
-            'technical': ['api', 'code', 'programming', 'development', 'software'],
-            'product': ['features', 'specifications', 'capabilities', 'functions'],
-            'support': ['help', 'issue', 'problem', 'error', 'troubleshoot'],
-            'information': ['what', 'how', 'when', 'where', 'why', 'explain'],
-            'configuration': ['setup', 'config', 'settings', 'install', 'configure']
-        }
-
-        topics = []
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                topics.append(topic)
+        return [topic for topic, pattern in _TOPIC_PATTERNS.items()
+                if pattern.search(text)]
 
-        return topics
+    @staticmethod
+    def _get_file_state(path: str) -> Optional[Tuple[int, int]]:
+        """Modification time and size of a file, or None if it does not exist."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def get_user_profile(self, user_id: str) -> Dict[str, Any]:
         """Get user profile with interaction history."""
         profile_path = self._get_user_profile_path(user_id)
+        file_state = self._get_file_state(profile_path)
+
+        cached = self._profile_cache.get(user_id)
+        if cached is not None and cached[0] == file_state:
+            profile = cached[1]
+            profile["memory_stats"]["total_memories"] = len(
+                self._load_user_memories(user_id))
+            return profile
 
         default_profile = {
             "user_id": user_id,
@@ -318,20 +591,21 @@ class VectorMemoryManager:
         }
 
         try:
-            if os.path.exists(profile_path):
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    profile = json.load(f)
-                    # Ensure all required fields exist
-                    for key, value in default_profile.items():
-                        if key not in profile:
-                            profile[key] = value
-            else:
+            try:
+                with open(profile_path, 'rb') as f:
+                    profile = orjson.loads(f.read())
+                # Ensure all required fields exist
+                for key, value in default_profile.items():
+                    if key not in profile:
+                        profile[key] = value
+            except FileNotFoundError:
                 profile = default_profile
 
             # Update memory stats
             memories = self._load_user_memories(user_id)
             profile["memory_stats"]["total_memories"] = len(memories)
 
+            self._profile_cache[user_id] = (file_state, profile)
             return profile
 
         except Exception as e:
@@ -352,10 +626,16 @@ class VectorMemoryManager:
                 profile["topics_of_interest"].append(topic)
 
         # Save updated profile
+        self._save_user_profile(user_id, profile)
+
+    def _save_user_profile(self, user_id: str, profile: Dict[str, Any]):
+        """Write the (cached) user profile back to disk."""
         profile_path = self._get_user_profile_path(user_id)
         try:
-            with open(profile_path, 'w', encoding='utf-8') as f:
-                json.dump(profile, f, indent=2, ensure_ascii=False)
+            with open(profile_path, 'wb') as f:
+                f.write(orjson.dumps(profile))
+            self._profile_cache[user_id] = (
+                self._get_file_state(profile_path), profile)
         except Exception as e:
             logger.error(f"Failed to update user profile: {e}")
 
@@ -422,12 +702,7 @@ class VectorMemoryManager:
                 profile["topics_of_interest"].append(topic)
 
         # Save updated profile
-        profile_path = self._get_user_profile_path(user_id)
-        try:
-            with open(profile_path, 'w', encoding='utf-8') as f:
-                json.dump(profile, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Failed to update user profile: {e}")
+        self._save_user_profile(user_id, profile)
 
     def get_memory_analytics(self, user_id: str) -> Dict[str, Any]:
         """Get analytics about user's memory usage and patterns."""
@@ -450,10 +725,14 @@ class VectorMemoryManager:
             total_query_length += memory.get('query_length', 0)
             total_response_length += memory.get('response_length', 0)
 
-        # Get date range for frequency calculation
-        dates = [datetime.fromisoformat(m['timestamp']) for m in memories]
-        if dates:
-            date_range = (max(dates) - min(dates)).days or 1
+        # Get date range for frequency calculation; memories stored before
+        # timestamp_epoch existed fall back to parsing the ISO timestamp
+        epochs = np.fromiter(
+            (m.get('timestamp_epoch') or datetime.fromisoformat(m['timestamp']).timestamp()
+             for m in memories),
+            dtype=np.float64, count=len(memories))
+        if epochs.size:
+            date_range = int((epochs.max() - epochs.min()) // 86400) or 1
             interaction_frequency = len(memories) / date_range
         else:
             interaction_frequency = 0
@@ -464,6 +743,6 @@ class VectorMemoryManager:
             "avg_response_length": total_response_length / len(memories) if memories else 0,
             "top_topics": sorted(topics_count.items(), key=lambda x: x[1], reverse=True)[:5],
             "interaction_frequency": interaction_frequency,
-            "memory_span_days": date_range if dates else 0,
+            "memory_span_days": date_range if epochs.size else 0,
             "similarity_threshold": self.similarity_threshold
         }
@@ -0,0 +1,23 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+import os
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.identity.aio import DefaultAzureCredential, ManagedIdentityCredential
+
+
+def create_credential() -> AsyncTokenCredential:
+    """
+    Create the async credential used to call the Azure AI project.
+
+    In production the app always runs as its user-assigned managed identity, so
+    the credential is pinned to it instead of walking the DefaultAzureCredential
+    chain. Elsewhere the chain is kept so developer logins keep working.
+
+    :return: The credential, to be closed by the caller.
+    :rtype: AsyncTokenCredential
+    """
+    if os.getenv("RUNNING_IN_PRODUCTION"):
+        return ManagedIdentityCredential(client_id=os.getenv("AZURE_CLIENT_ID"))
+    return DefaultAzureCredential(exclude_shared_token_cache_credential=True)
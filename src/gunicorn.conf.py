@@ -1,60 +1,112 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license.
 # See LICENSE file in the project root for full license information.
-from typing import Dict, List
+from types import MappingProxyType
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import asyncio
-import csv
+import functools
+import hashlib
 import json
-import logging
 import multiprocessing
 import os
-import sys
+import tempfile
 
 from azure.ai.projects.aio import AIProjectClient
 from azure.ai.agents.models import (
     Agent,
     AsyncToolSet,
     AzureAISearchTool,
+    FileInfo,
     FilePurpose,
     FileSearchTool,
+    FileState,
     Tool,
 )
 from azure.ai.projects.models import ConnectionType, ApiKeyCredentials
-from azure.identity.aio import DefaultAzureCredential
 from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (it ships with uvicorn[standard], but not on Windows).
+    uvloop = None
+
+from credential_config import create_credential
 from logging_config import configure_logging
+from personalities import AGENT_PERSONALITIES
 from api.file_parser import FileParser
 from api.enhanced_file_search import EnhancedFileSearch
 
 load_dotenv()
 
+if uvloop is not None:
+    # UvicornWorker already picks uvloop (loop="auto"); installing the policy
+    # here also puts the asyncio.run() calls in on_starting and __main__ on it.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 logger = configure_logging(os.getenv("APP_LOG_FILE", ""))
 
 
-agentID = os.environ.get("AZURE_EXISTING_AGENT_ID") if os.environ.get(
-    "AZURE_EXISTING_AGENT_ID") else os.environ.get(
-        "AZURE_AI_AGENT_ID")
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Deployment settings, read from the environment once at import."""
+    agent_id: Optional[str]
+    project_endpoint: Optional[str]
+    agent_name: Optional[str]
+    agent_deployment_name: Optional[str]
+    agent_personality: str
+    search_endpoint: Optional[str]
+    search_index_name: Optional[str]
+    embed_deployment_name: Optional[str]
+    embed_dimensions: Optional[int]
+
+    @classmethod
+    def from_environ(cls) -> "Config":
+        embed_dimensions = os.environ.get("AZURE_AI_EMBED_DIMENSIONS")
+        return cls(
+            agent_id=(os.environ.get("AZURE_EXISTING_AGENT_ID")
+                      or os.environ.get("AZURE_AI_AGENT_ID")),
+            project_endpoint=os.environ.get("AZURE_EXISTING_AIPROJECT_ENDPOINT"),
+            agent_name=os.environ.get("AZURE_AI_AGENT_NAME"),
+            agent_deployment_name=os.environ.get("AZURE_AI_AGENT_DEPLOYMENT_NAME"),
+            agent_personality=os.environ.get(
+                "AZURE_AI_AGENT_PERSONALITY", "default"),
+            search_endpoint=os.environ.get("AZURE_AI_SEARCH_ENDPOINT"),
+            search_index_name=os.environ.get("AZURE_AI_SEARCH_INDEX_NAME"),
+            embed_deployment_name=os.environ.get("AZURE_AI_EMBED_DEPLOYMENT_NAME"),
+            embed_dimensions=int(embed_dimensions) if embed_dimensions else None,
+        )
+
 
-proj_endpoint = os.environ.get("AZURE_EXISTING_AIPROJECT_ENDPOINT")
+CONFIG = Config.from_environ()
 
+# Largest page list_agents accepts (the default page is 20 agents)
+LIST_AGENTS_PAGE_SIZE = 100
 
-def list_files_in_files_directory() -> List[str]:
-    # Get the absolute path of the 'files' directory
-    files_directory = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), 'files'))
 
-    # List all files in the 'files' directory
-    files = [f for f in os.listdir(files_directory) if os.path.isfile(
-        os.path.join(files_directory, f))]
+# Paths next to this file, resolved once at import
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILES_DIRECTORY = os.path.join(_MODULE_DIR, 'files')
+EMBEDDINGS_PATH = os.path.join(_MODULE_DIR, 'data', 'embeddings.csv')
 
-    return files
 
+def list_files_in_files_directory() -> List[str]:
+    # List all files in the 'files' directory; DirEntry.is_file uses the
+    # file type from the directory listing instead of a stat per file
+    with os.scandir(FILES_DIRECTORY) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
 
-FILES_NAMES = list_files_in_files_directory()
+
+# Listed once at import (before the fork under preload_app); tuples so the
+# shared listing cannot be changed by accident
+FILES_NAMES: Tuple[str, ...] = tuple(list_files_in_files_directory())
+FILES_PATHS: Tuple[str, ...] = tuple(
+    os.path.join(FILES_DIRECTORY, name) for name in FILES_NAMES)
 
 
 async def create_index_maybe(
@@ -71,9 +123,18 @@ async def create_index_maybe(
     :param creds: The credentials, used for the index.
     """
     from api.search_index_manager import SearchIndexManager
-    endpoint = os.environ.get('AZURE_AI_SEARCH_ENDPOINT')
-    embedding = os.getenv('AZURE_AI_EMBED_DEPLOYMENT_NAME')
+    endpoint = CONFIG.search_endpoint
+    embedding = CONFIG.embed_deployment_name
     if endpoint and embedding:
+        # The index dimensions cannot be derived here, so there is nothing
+        # to create without them
+        if not CONFIG.embed_dimensions:
+            logger.warning(
+                "AZURE_AI_EMBED_DIMENSIONS is not set, skipping index creation.")
+            return
+        # Fail before creating an index that could never be populated
+        if not os.path.isfile(EMBEDDINGS_PATH):
+            raise FileNotFoundError(f'File {EMBEDDINGS_PATH} not found.')
         try:
             aoai_connection = await ai_client.connections.get_default(
                 connection_type=ConnectionType.AZURE_OPEN_AI, include_credentials=True)
@@ -88,7 +149,7 @@ async def create_index_maybe(
         search_mgr = SearchIndexManager(
             endpoint=endpoint,
             credential=creds,
-            index_name=os.getenv('AZURE_AI_SEARCH_INDEX_NAME'),
+            index_name=CONFIG.search_index_name,
             dimensions=None,
             model=embedding,
             deployment_name=embedding,
@@ -98,56 +159,34 @@ async def create_index_maybe(
         # If another application instance already have created the index,
         # do not upload the documents.
         if await search_mgr.create_index(
-            vector_index_dimensions=int(
-                os.getenv('AZURE_AI_EMBED_DIMENSIONS'))):
-            embeddings_path = os.path.join(
-                os.path.dirname(__file__), 'data', 'embeddings.csv')
-
-            assert embeddings_path, f'File {embeddings_path} not found.'
-            await search_mgr.upload_documents(embeddings_path)
+            vector_index_dimensions=CONFIG.embed_dimensions,
+            compression_kind="scalar"):
+            await search_mgr.upload_documents(EMBEDDINGS_PATH)
             await search_mgr.close()
 
 
-def _get_file_path(file_name: str) -> str:
-    """
-    Get absolute file path.
-
-    :param file_name: The file name.
-    """
-    return os.path.abspath(
-        os.path.join(os.path.dirname(__file__),
-                     'files',
-                     file_name))
-
-
 async def get_available_tool(
         project_client: AIProjectClient,
-        creds: AsyncTokenCredential) -> Tool:
+        creds: AsyncTokenCredential) -> Tuple[Tool, str]:
     """
-    Get the toolset and tool definition for the agent.
+    Get the tool definition for the agent.
 
     :param ai_client: The project client to be used to create an index.
     :param creds: The credentials, used for the index.
-    :return: The tool set, available based on the environment.
+    :return: The tool available based on the environment and its label,
+             "AI Search" or "File Search".
     """
-    # File name -> {"id": file_id, "path": file_path}
-    file_ids: List[str] = []
     # First try to get an index search.
     conn_id = ""
-    if os.environ.get('AZURE_AI_SEARCH_INDEX_NAME'):
-        conn_list = project_client.connections.list()
-        async for conn in conn_list:
-            if conn.type == ConnectionType.AZURE_AI_SEARCH:
-                conn_id = conn.id
-                break
+    if CONFIG.search_index_name:
+        conn_id = await _get_search_connection_id(project_client)
 
-    toolset = AsyncToolSet()
     if conn_id:
         await create_index_maybe(project_client, creds)
 
         return AzureAISearchTool(
             index_connection_id=conn_id,
-            index_name=os.environ.get('AZURE_AI_SEARCH_INDEX_NAME'))
+            index_name=CONFIG.search_index_name), "AI Search"
     else:
         logger.info(
             "agent: index was not initialized, falling back to file search.")
@@ -163,24 +202,55 @@ async def get_available_tool(
         logger.info(
             f"Found {len(categories)} categories: {', '.join(categories.keys())}")
 
-        # Upload files for file search with enhanced metadata
-        for file_name in FILES_NAMES:
-            file_path = _get_file_path(file_name)
+        # Bound concurrent uploads so they do not exhaust the connection pool
+        upload_semaphore = asyncio.Semaphore(8)
+        files_cache_path = _uploaded_files_cache_path()
+        uploaded_files = _read_uploaded_files_cache(files_cache_path)
 
-            # Use enhanced file parser to extract metadata
+        async def upload_file(file_name: str, file_path: str) -> FileInfo:
+            # Use enhanced file parser to extract metadata; parsing reads and
+            # scans the whole file, so keep it off the event loop
             try:
-                content, metadata = FileParser.parse_file(file_path)
+                content, metadata = await asyncio.to_thread(
+                    FileParser.parse_file, file_path)
                 logger.info(
                     f"Processed file {file_name} with metadata: {metadata}")
             except Exception as e:
                 logger.warning(f"Error processing file {file_name}: {str(e)}")
 
-            # Upload file to agent
-            file = await project_client.agents.files.upload_and_poll(
-                file_path=file_path, purpose=FilePurpose.AGENTS)
-
-            # Store file ID
-            file_ids.append(file.id)
+            # Reuse the file uploaded by a previous start if its content is
+            # unchanged and the service still has it
+            digest = await asyncio.to_thread(_file_digest, file_path)
+            cached = uploaded_files.get(file_name)
+            async with upload_semaphore:
+                if cached and cached.get("sha256") == digest:
+                    try:
+                        file = await project_client.agents.files.get(cached["id"])
+                        if file.status not in _FILE_UNUSABLE_STATES:
+                            logger.info(
+                                f"Reusing uploaded file {file_name}, ID: {file.id}")
+                            return file
+                    except ResourceNotFoundError:
+                        pass
+                    except HttpResponseError as e:
+                        logger.warning(
+                            f"Could not validate uploaded file {file_name}, "
+                            f"uploading it again: {e}")
+                # Upload file to agent; processing is polled for all files at once
+                file = await project_client.agents.files.upload(
+                    file_path=file_path, purpose=FilePurpose.AGENTS)
+            uploaded_files[file_name] = {"sha256": digest, "id": file.id}
+            return file
+
+        # Upload files for file search with enhanced metadata, overlapping
+        # the upload round-trips; gather keeps the FILES_NAMES order
+        files = await asyncio.gather(
+            *(upload_file(file_name, file_path)
+              for file_name, file_path in zip(FILES_NAMES, FILES_PATHS)))
+        await _wait_for_files_processed(project_client, files)
+        _write_uploaded_files_cache(files_cache_path, {
+            name: uploaded_files[name] for name in FILES_NAMES if name in uploaded_files})
+        file_ids = [file.id for file in files]
 
         # Create the vector store using the file IDs.
         vector_store = await project_client.agents.vector_stores.create_and_poll(
@@ -190,84 +260,147 @@ async def get_available_tool(
         logger.info(
             "agent: enhanced file store and vector store created successfully")
 
-        return FileSearchTool(vector_store_ids=[vector_store.id])
+        return FileSearchTool(vector_store_ids=[vector_store.id]), "File Search"
+
+
+_FILE_IN_PROGRESS_STATES = frozenset(
+    (FileState.UPLOADED, FileState.PENDING, FileState.RUNNING))
+_FILE_UNUSABLE_STATES = frozenset(
+    (FileState.ERROR, FileState.DELETING, FileState.DELETED))
+
+
+def _file_digest(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _uploaded_files_cache_path() -> str:
+    """Get the path of the on-disk cache of files uploaded to this project."""
+    cache_key = hashlib.sha256(
+        f"{CONFIG.project_endpoint}".encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"agent-files-{cache_key}.json")
+
+
+def _read_uploaded_files_cache(cache_path: str) -> Dict[str, Dict[str, str]]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            uploaded_files = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return uploaded_files if isinstance(uploaded_files, dict) else {}
+
+
+def _write_uploaded_files_cache(
+        cache_path: str, uploaded_files: Dict[str, Dict[str, str]]) -> None:
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(uploaded_files, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache uploaded file IDs: {e}")
+
+
+async def _wait_for_files_processed(
+        project_client: AIProjectClient,
+        files: List[FileInfo],
+        polling_interval: float = 1) -> None:
+    """
+    Wait until the uploaded files are no longer being processed.
+
+    Instead of polling every file separately, the agent files are listed
+    once per interval and checked together.
+
+    :param project_client: The project client the files were uploaded with.
+    :param files: The uploaded files.
+    :param polling_interval: The seconds to wait between checks.
+    """
+    pending = {file.id for file in files if file.status in _FILE_IN_PROGRESS_STATES}
+    while pending:
+        await asyncio.sleep(polling_interval)
+        file_list = await project_client.agents.files.list(
+            purpose=FilePurpose.AGENTS)
+        statuses = {file.id: file.status for file in file_list.data}
+        for file_id in list(pending):
+            status = statuses.get(file_id)
+            if status is None:
+                # Not in the listing, ask for this file directly
+                status = (await project_client.agents.files.get(file_id)).status
+            if status not in _FILE_IN_PROGRESS_STATES:
+                pending.discard(file_id)
+                if status != FileState.PROCESSED:
+                    logger.warning(f"File {file_id} finished with status {status}")
+
+
+def _render_personalities(tool_type: str) -> Mapping[str, Mapping[str, Any]]:
+    """
+    Resolve the personality instructions for a search tool kind.
+
+    :param tool_type: The agent's search tool, "AI Search" or "File Search".
+    :return: Read-only mapping of personality name to its configuration.
+    """
+    personalities = {}
+    for name, config in AGENT_PERSONALITIES.items():
+        citations = "" if tool_type == "AI Search" else config["citations"] + " "
+        personalities[name] = MappingProxyType({
+            "instructions": config["instructions"].format(
+                tool_type=tool_type, citations=citations).strip(),
+            "temperature": config["temperature"],
+        })
+    return MappingProxyType(personalities)
+
+
+# Both variants are rendered at import, so the preloaded copy is shared by the
+# workers and create_agent only does a lookup.
+_PERSONALITIES_BY_TOOL: Mapping[str, Mapping[str, Mapping[str, Any]]] = MappingProxyType({
+    tool_type: _render_personalities(tool_type)
+    for tool_type in ("AI Search", "File Search")
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _get_personality_config(
+        personality_name: str,
+        tool_type: str) -> Tuple[str, Mapping[str, Any]]:
+    personalities = _PERSONALITIES_BY_TOOL[tool_type]
+    if personality_name not in personalities:
+        logger.warning(
+            f"Unknown personality '{personality_name}', falling back to default")
+        personality_name = "default"
+    return personality_name, personalities[personality_name]
+
+
+def get_personality_config(
+        tool_type: str,
+        personality_name: Optional[str] = None) -> Tuple[str, Mapping[str, Any]]:
+    """
+    Get the personality to create the agent with.
+
+    :param tool_type: The agent's search tool, "AI Search" or "File Search".
+    :param personality_name: The personality, defaults to AZURE_AI_AGENT_PERSONALITY.
+    :return: The resolved personality name and its read-only configuration.
+    """
+    if personality_name is None:
+        personality_name = CONFIG.agent_personality
+    return _get_personality_config(personality_name, tool_type)
 
 
 async def create_agent(ai_client: AIProjectClient,
                        creds: AsyncTokenCredential) -> Agent:
     logger.info("Creating new agent with resources")
-    tool = await get_available_tool(ai_client, creds)
+    tool, tool_type = await get_available_tool(ai_client, creds)
     toolset = AsyncToolSet()
     toolset.add(tool)
 
-    # Define predefined agent personalities
-    agent_personalities = {
-        "default": {
-            "instructions": "Use AI Search always. Avoid to use base knowledge." if isinstance(tool, AzureAISearchTool) else
-            "Use File Search always. Avoid to use base knowledge. Always include proper citations for information found in files. " +
-            "For each piece of information retrieved from a file, add a citation in the format [Source: Filename, Section X]. " +
-            "Organize your responses to clearly distinguish between information from different sources.",
-            "temperature": 0.7,
-        },
-        "customer_service": {
-            "instructions": "You are a helpful customer service assistant. Always be polite, patient, and professional. " +
-            ("Use AI Search to find accurate information about our products and services. " if isinstance(tool, AzureAISearchTool) else
-                "Use File Search to find accurate information about our products and services. " +
-                "Always provide citations for specific product information using [Source: Product Name, Brand, ID]. " +
-                "When discussing customer information, be sure to reference the source document. " +
-                "If information is available from multiple sources, prefer the most recent or most detailed source.") +
-            "If you don't know the answer, admit it and offer to connect the customer with a human representative.",
-            "temperature": 0.5,
-        },
-        "technical_support": {
-            "instructions": "You are a technical support specialist. Provide clear, concise, and accurate technical information. " +
-            ("Use AI Search to find specific technical details. " if isinstance(tool, AzureAISearchTool) else
-                "Use File Search to find specific technical details. " +
-                "Always cite your sources when providing technical information, using the format [Source: Document Name, Section X]. " +
-                "Be precise with citations, including exact section or page numbers when available. " +
-                "When providing step-by-step instructions, ensure each step is accurate based on the documentation.") +
-            "Use technical language when appropriate but be able to explain concepts in simpler terms when needed.",
-            "temperature": 0.3,
-        },
-        "sales_assistant": {
-            "instructions": "You are a sales assistant focused on helping customers find the right products. " +
-            ("Use AI Search to provide product information and make appropriate recommendations. " if isinstance(tool, AzureAISearchTool) else
-                "Use File Search to provide product information and make appropriate recommendations. " +
-                "Always cite product features and specifications with their source documents. " +
-                "When comparing products, clearly indicate the source of each comparison point. " +
-                "Format citations as [Product Name, Brand, Category] to help customers easily identify product information sources.") +
-            "Highlight product benefits and features that match customer needs without being pushy.",
-            "temperature": 0.6,
-        },
-        "concierge": {
-            "instructions": "You are a sophisticated and courteous concierge assistant. " +
-            ("Use AI Search to provide personalized recommendations and assistance. " if isinstance(tool, AzureAISearchTool) else
-                "Use File Search to provide personalized recommendations and assistance. " +
-                "When providing information from files, elegantly incorporate citations without disrupting the refined tone. " +
-                "Use discreet citation formats such as 'According to [Source]' or footnote-style references at the end of your responses. " +
-                "Ensure all recommendations are based on accurate information from the knowledge base.") +
-            "Maintain a refined, professional tone while being warm and accommodating. Focus on providing exceptional service and attention to detail.",
-            "temperature": 0.7,
-        }
-    }
-
-    # Get the selected personality from environment variable or use default
-    selected_personality = os.environ.get(
-        "AZURE_AI_AGENT_PERSONALITY", "default")
-    if selected_personality not in agent_personalities:
-        logger.warning(
-            f"Unknown personality '{selected_personality}', falling back to default")
-        selected_personality = "default"
-
-    personality = agent_personalities[selected_personality]
+    personality_name, personality = get_personality_config(tool_type)
     instructions = personality["instructions"]
     temperature = personality.get("temperature", 0.7)
 
-    logger.info(f"Creating agent with personality: {selected_personality}")
+    logger.info(f"Creating agent with personality: {personality_name}")
 
     agent = await ai_client.agents.create_agent(
-        model=os.environ["AZURE_AI_AGENT_DEPLOYMENT_NAME"],
-        name=os.environ["AZURE_AI_AGENT_NAME"],
+        model=CONFIG.agent_deployment_name,
+        name=CONFIG.agent_name,
         instructions=instructions,
         temperature=temperature,
         toolset=toolset
@@ -275,43 +408,141 @@ async def create_agent(ai_client: AIProjectClient,
     return agent
 
 
+def _agent_id_cache_path(agent_name: str) -> str:
+    """
+    Get the path of the on-disk agent ID cache for this project and agent name.
+
+    :param agent_name: The agent name.
+    """
+    cache_key = hashlib.sha256(
+        f"{CONFIG.project_endpoint}|{agent_name}".encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"agent-{cache_key}.id")
+
+
+def _search_connection_cache_path() -> str:
+    """Get the path of the on-disk AI Search connection ID cache for this project."""
+    cache_key = hashlib.sha256(
+        f"{CONFIG.project_endpoint}".encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"search-conn-{cache_key}.id")
+
+
+def _read_cached_id(cache_path: str) -> Optional[str]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_cached_id(cache_path: str, resource_id: str) -> None:
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(resource_id)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache ID in {cache_path}: {e}")
+
+
+def _remove_cached_id(cache_path: str) -> None:
+    try:
+        os.remove(cache_path)
+    except OSError:
+        pass
+
+
+async def _get_search_connection_id(project_client: AIProjectClient) -> str:
+    """
+    Get the ID of the project's Azure AI Search connection.
+
+    The ID is stable per project, so it is cached on disk; a cached ID is
+    checked with a single get instead of scanning the connection list.
+
+    :param project_client: The project client.
+    :return: The connection ID, or an empty string if there is none.
+    """
+    cache_path = _search_connection_cache_path()
+    cached_conn_id = _read_cached_id(cache_path)
+    if cached_conn_id:
+        try:
+            conn = await project_client.connections.get(
+                cached_conn_id.rsplit('/', 1)[-1])
+            if conn.type == ConnectionType.AZURE_AI_SEARCH:
+                return conn.id
+        except Exception as e:
+            logger.warning(
+                f"Could not retrieve cached search connection {cached_conn_id}: {e}")
+        _remove_cached_id(cache_path)
+
+    # The service filters by type, so the first connection is the one we need
+    conn = await anext(project_client.connections.list(
+        connection_type=ConnectionType.AZURE_AI_SEARCH), None)
+    if conn is None:
+        return ""
+    _write_cached_id(cache_path, conn.id)
+    return conn.id
+
+
 async def initialize_resources():
     try:
-        async with DefaultAzureCredential(
-                exclude_shared_token_cache_credential=True) as creds:
+        async with create_credential() as creds:
             async with AIProjectClient(
                 credential=creds,
-                endpoint=proj_endpoint
+                endpoint=CONFIG.project_endpoint
             ) as ai_client:
                 # If the environment already has AZURE_AI_AGENT_ID or AZURE_EXISTING_AGENT_ID, try
                 # fetching that agent
-                if agentID is not None:
+                if CONFIG.agent_id:
                     try:
                         agent = await ai_client.agents.get_agent(
-                            agentID)
+                            CONFIG.agent_id)
                         logger.info(f"Found agent by ID: {agent.id}")
                         return
                     except Exception as e:
                         logger.warning(
                             "Could not retrieve agent by AZURE_EXISTING_AGENT_ID = "
-                            f"{agentID}, error: {e}")
+                            f"{CONFIG.agent_id}, error: {e}")
+
+                # Try the agent ID resolved by a previous start
+                agent_name = CONFIG.agent_name
+                if not agent_name:
+                    raise KeyError("AZURE_AI_AGENT_NAME")
+                cache_path = _agent_id_cache_path(agent_name)
+                cached_agent_id = _read_cached_id(cache_path)
+                if cached_agent_id:
+                    try:
+                        agent = await ai_client.agents.get_agent(
+                            cached_agent_id)
+                        if agent.name == agent_name:
+                            logger.info(f"Found cached agent ID: {agent.id}")
+                            os.environ["AZURE_EXISTING_AGENT_ID"] = agent.id
+                            return
+                    except ResourceNotFoundError:
+                        logger.info(
+                            f"Cached agent ID {cached_agent_id} no longer exists")
+                        _remove_cached_id(cache_path)
+                    except Exception as e:
+                        logger.warning(
+                            f"Could not retrieve cached agent ID {cached_agent_id}: {e}")
 
-                # Check if an agent with the same name already exists
-                agent_list = ai_client.agents.list_agents()
+                # Check if an agent with the same name already exists. The service
+                # has no name filter, so fetch the largest page size it allows.
+                agent_list = ai_client.agents.list_agents(limit=LIST_AGENTS_PAGE_SIZE)
                 if agent_list:
                     async for agent_object in agent_list:
-                        if agent_object.name == os.environ[
-                                "AZURE_AI_AGENT_NAME"]:
+                        if agent_object.name == agent_name:
                             logger.info(
                                 "Found existing agent named "
                                 f"'{agent_object.name}'"
                                 f", ID: {agent_object.id}")
                             os.environ["AZURE_EXISTING_AGENT_ID"] = agent_object.id
+                            _write_cached_id(cache_path, agent_object.id)
                             return
 
                 # Create a new agent
                 agent = await create_agent(ai_client, creds)
                 os.environ["AZURE_EXISTING_AGENT_ID"] = agent.id
+                _write_cached_id(cache_path, agent.id)
                 logger.info(f"Created agent, agent ID: {agent.id}")
 
     except Exception as e:
@@ -321,10 +552,13 @@ async def initialize_resources():
 
 def on_starting(server):
     """This code runs once before the workers will start."""
-    asyncio.get_event_loop().run_until_complete(initialize_resources())
+    asyncio.run(initialize_resources())
 
 
-max_requests = 1000
+# Recycling workers makes each replacement rebuild its Azure connection pool,
+# so it is off unless a leak calls for it (0 disables the limit). A replacement
+# still warms its pool in the app lifespan before it takes traffic.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
 max_requests_jitter = 50
 log_file = "-"
 bind = "0.0.0.0:50505"
@@ -338,12 +572,15 @@ if not os.getenv("RUNNING_IN_PRODUCTION"):
 # https://docs.gunicorn.org/en/stable/settings.html
 preload_app = True
 num_cpus = multiprocessing.cpu_count()
-workers = (num_cpus * 2) + 1
+# Each UvicornWorker runs an asyncio loop that multiplexes many I/O-bound
+# requests, so one worker per CPU is enough; the (2 * cpu) + 1 sync-worker
+# heuristic only multiplied Azure connection pools and memory.
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, num_cpus)))
 worker_class = "uvicorn.workers.UvicornWorker"
 
 timeout = 120
 
 if __name__ == "__main__":
-    print("Running initialize_resources directly...")
+    logger.info("Running initialize_resources directly...")
     asyncio.run(initialize_resources())
-    print("initialize_resources finished.")
+    logger.info("initialize_resources finished.")
@@ -3,7 +3,11 @@
 
 import logging
 import sys
-from typing import Optional
+from typing import Optional, Set, Tuple
+
+# (logger name, log file) pairs that already have handlers attached; a log
+# file of None stands for the stdout handler
+_configured: Set[Tuple[str, Optional[str]]] = set()
 
 def configure_logging(log_file_name: Optional[str] = None, logger_name: str = "azureaiapp") -> logging.Logger:
     """
@@ -17,17 +21,25 @@ def configure_logging(log_file_name: Optional[str] = None, logger_name: str = "a
     :rtype: logging.Logger
     """
     logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.INFO)
 
-    # Stream handler (stdout)
-    stream_handler = logging.StreamHandler(sys.stdout)
-    stream_handler.setLevel(logging.INFO)
-    stream_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
-    stream_handler.setFormatter(stream_formatter)
-    logger.addHandler(stream_handler)
+    # gunicorn.conf.py and create_app both configure logging in the same process
+    # under preload_app; attach each handler only once so lines are not duplicated.
+    stream_key = (logger_name, None)
+    if stream_key not in _configured:
+        _configured.add(stream_key)
+        logger.setLevel(logging.INFO)
+
+        # Stream handler (stdout)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setLevel(logging.INFO)
+        stream_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+        stream_handler.setFormatter(stream_formatter)
+        logger.addHandler(stream_handler)
 
     # File handler if a log file is specified
-    if log_file_name:
+    file_key = (logger_name, log_file_name or None)
+    if log_file_name and file_key not in _configured:
+        _configured.add(file_key)
         file_handler = logging.FileHandler(log_file_name)
         file_handler.setLevel(logging.INFO)
         file_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
@@ -5,14 +5,25 @@ Task Management Script for AI Agent Project
 This script helps manage and track tasks across different categories.
 """
 
+import heapq
 import os
 import sys
 import re
 import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
 
+# "**Field**: value" line prefixes and the task keys they fill
+_FIELD_PREFIXES = (
+    ('**Status**: ', 'status'),
+    ('**Priority**: ', 'priority'),
+    ('**Estimated Time**: ', 'estimated_time'),
+    ('**Description**: ', 'description'),
+)
+
 
 class TaskManager:
     def __init__(self, tasks_dir: str = None):
@@ -25,80 +36,75 @@ class TaskManager:
             '⏸️': 'paused',
             '❌': 'blocked'
         }
+        self.status_to_icon = {
+            status: icon for icon, status in self.status_icons.items()}
+        # Finds the first status icon in a status line in one scan
+        self._status_icon_re = re.compile(
+            '|'.join(map(re.escape, self.status_icons)))
+        # Parsed tasks, reused while no task file was added, removed or changed
+        self._task_cache = None
+        self._task_cache_key = None
 
     def parse_task_file(self, file_path: Path) -> Dict[str, Any]:
         """Parse a task markdown file and extract task information."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
         tasks = []
         current_task = None
 
-        lines = content.split('\n')
-        for line in lines:
-            # Match task headers
-            task_match = re.match(r'^### (\d+)\. (.+)$', line)
-            if task_match:
-                if current_task:
-                    tasks.append(current_task)
-
-                current_task = {
-                    'id': task_match.group(1),
-                    'title': task_match.group(2),
-                    'status': 'unknown',
-                    'priority': 'unknown',
-                    'estimated_time': 'unknown',
-                    'description': '',
-                    'subtasks': []
-                }
-                continue
-
-            if current_task:
-                # Match status
-                status_match = re.match(r'^\*\*Status\*\*: (.+)$', line)
-                if status_match:
-                    status_text = status_match.group(1)
-                    for icon, status in self.status_icons.items():
-                        if icon in status_text:
-                            current_task['status'] = status
-                            break
+        # Stream the file. splitlines() on each chunk also breaks at a lone
+        # '\r' and drops '\r\n', as text-mode universal newlines did.
+        with open(file_path, 'rb') as f:
+            # Only headers, field lines and subtasks matter, so skip every
+            # other line on its first byte before paying for the decode
+            lines = (line for chunk in f for line in chunk.splitlines())
+            for raw_line in lines:
+                if raw_line[:1] not in (b'#', b'*', b'-'):
                     continue
-
-                # Match priority
-                priority_match = re.match(r'^\*\*Priority\*\*: (.+)$', line)
-                if priority_match:
-                    current_task['priority'] = priority_match.group(1).lower()
-                    continue
-
-                # Match estimated time
-                time_match = re.match(r'^\*\*Estimated Time\*\*: (.+)$', line)
-                if time_match:
-                    current_task['estimated_time'] = time_match.group(1)
+                line = raw_line.decode('utf-8')
+                # Dispatch on the marker so each line is only tested as one kind
+                marker = line[0]
+                if marker == '#':
+                    # Match task headers: "### <digits>. <title>"
+                    task_id, sep, title = line[4:].partition('. ')
+                    if (line.startswith('### ') and sep and title
+                            and task_id.isdecimal()):
+                        if current_task:
+                            tasks.append(current_task)
+
+                        current_task = {
+                            'id': task_id,
+                            'title': title,
+                            'status': 'unknown',
+                            'priority': 'unknown',
+                            'estimated_time': 'unknown',
+                            'description': '',
+                            'subtasks': []
+                        }
                     continue
 
-                # Match description
-                desc_match = re.match(r'^\*\*Description\*\*: (.+)$', line)
-                if desc_match:
-                    current_task['description'] = desc_match.group(1)
+                if not current_task:
                     continue
 
-                # Match subtasks
-                subtask_match = re.match(r'^- \[ \] (.+)$', line)
-                if subtask_match:
-                    current_task['subtasks'].append({
-                        'title': subtask_match.group(1),
-                        'completed': False
-                    })
-                    continue
-
-                # Match completed subtasks
-                completed_match = re.match(r'^- \[x\] (.+)$', line)
-                if completed_match:
-                    current_task['subtasks'].append({
-                        'title': completed_match.group(1),
-                        'completed': True
-                    })
-                    continue
+                if marker == '*':
+                    # Match the "**Field**: value" lines
+                    for prefix, field in _FIELD_PREFIXES:
+                        if line.startswith(prefix):
+                            value = line[len(prefix):]
+                            if not value:
+                                break
+                            if field == 'status':
+                                icon_match = self._status_icon_re.search(value)
+                                if icon_match:
+                                    current_task['status'] = self.status_icons[
+                                        icon_match.group()]
+                            elif field == 'priority':
+                                current_task['priority'] = value.strip().lower()
+                            else:
+                                current_task[field] = value
+                            break
+                # Match open and completed subtasks
+                elif line.startswith(('- [ ] ', '- [x] ')) and len(line) > 6:
+                    # Stored as (completed, title) tuples
+                    current_task['subtasks'].append((line[3] == 'x', line[6:]))
 
         if current_task:
             tasks.append(current_task)
@@ -111,18 +117,33 @@ class TaskManager:
 
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """Get all tasks from all task files."""
-        all_tasks = []
+        with os.scandir(self.tasks_dir) as it:
+            entries = [entry for entry in it
+                       if entry.name.endswith('.md')
+                       and entry.name != 'README.md' and entry.is_file()]
+        file_paths = [Path(entry.path) for entry in entries]
+        cache_key = tuple((entry.name, entry.stat().st_mtime_ns)
+                          for entry in entries)
+        if self._task_cache is not None and cache_key == self._task_cache_key:
+            return self._task_cache
+
+        # Read and parse the files concurrently; file reads release the GIL
+        with ThreadPoolExecutor(
+                max_workers=max(1, min(8, len(file_paths)))) as executor:
+            futures = [executor.submit(self.parse_task_file, file_path)
+                       for file_path in file_paths]
 
-        for file_path in self.tasks_dir.glob('*.md'):
-            if file_path.name == 'README.md':
-                continue
+        all_tasks = []
 
+        for file_path, future in zip(file_paths, futures):
             try:
-                task_data = self.parse_task_file(file_path)
+                task_data = future.result()
                 all_tasks.append(task_data)
             except Exception as e:
                 print(f"Error parsing {file_path}: {e}")
 
+        self._task_cache = all_tasks
+        self._task_cache_key = cache_key
         return all_tasks
 
     def print_summary(self):
@@ -133,10 +154,9 @@ class TaskManager:
         print("=" * 50)
 
         total_tasks = 0
-        status_counts = {status: 0 for status in self.status_icons.values()}
-        status_counts['unknown'] = 0
-
-        priority_counts = {'high': 0, 'medium': 0, 'low': 0, 'unknown': 0}
+        # Counters accept any status or priority, including unexpected ones
+        status_counts = Counter()
+        priority_counts = Counter()
 
         for category_data in all_tasks:
             category = category_data['category'].replace('_', ' ').title()
@@ -151,23 +171,18 @@ class TaskManager:
 
             for task in tasks:
                 total_tasks += 1
-                status = task['status'].strip()
-                priority = task['priority'].strip()
+                status = task['status']
 
                 status_counts[status] += 1
-                priority_counts[priority] += 1
+                priority_counts[task['priority']] += 1
 
                 # Get status icon
-                status_icon = '❓'
-                for icon, stat in self.status_icons.items():
-                    if stat == status:
-                        status_icon = icon
-                        break
+                status_icon = self.status_to_icon.get(status, '❓')
 
                 # Progress indicator for subtasks
                 if task['subtasks']:
                     completed = sum(
-                        1 for st in task['subtasks'] if st['completed'])
+                        done for done, _ in task['subtasks'])
                     total_subtasks = len(task['subtasks'])
                     progress = f"({completed}/{total_subtasks})"
                 else:
@@ -182,19 +197,13 @@ class TaskManager:
         print(f"Total Tasks: {total_tasks}")
 
         print("\nBy Status:")
-        for status, count in status_counts.items():
-            if count > 0:
-                icon = '❓'
-                for ic, st in self.status_icons.items():
-                    if st == status:
-                        icon = ic
-                        break
-                print(f"  {icon} {status.replace('_', ' ').title()}: {count}")
+        for status, count in status_counts.most_common():
+            icon = self.status_to_icon.get(status, '❓')
+            print(f"  {icon} {status.replace('_', ' ').title()}: {count}")
 
         print("\nBy Priority:")
-        for priority, count in priority_counts.items():
-            if count > 0:
-                print(f"  • {priority.title()}: {count}")
+        for priority, count in priority_counts.most_common():
+            print(f"  • {priority.title()}: {count}")
 
     def get_next_tasks(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get the next recommended tasks to work on."""
@@ -206,14 +215,16 @@ class TaskManager:
         priority_scores = {'high': 3, 'medium': 2, 'low': 1, 'unknown': 0}
         status_scores = {'new': 2, 'in_progress': 3, 'paused': 1,
                          'completed': 0, 'blocked': 0, 'unknown': 1}
+        priority_score = priority_scores.get
+        status_score = status_scores.get
 
         for category_data in all_tasks:
             for task in category_data['tasks']:
                 if task['status'] in ['completed', 'blocked']:
                     continue
 
-                score = priority_scores.get(
-                    task['priority'], 0) + status_scores.get(task['status'], 0)
+                score = priority_score(task['priority'], 0) + \
+                    status_score(task['status'], 0)
 
                 recommended.append({
                     'category': category_data['category'],
@@ -221,10 +232,9 @@ class TaskManager:
                     'score': score
                 })
 
-        # Sort by score (highest first)
-        recommended.sort(key=lambda x: x['score'], reverse=True)
-
-        return recommended[:limit]
+        # Highest scores first; nlargest keeps ties in task order, like a
+        # stable descending sort would
+        return heapq.nlargest(limit, recommended, key=lambda x: x['score'])
 
     def print_next_tasks(self, limit: int = 5):
         """Print the next recommended tasks."""
@@ -238,11 +248,7 @@ class TaskManager:
             category = item['category'].replace('_', ' ').title()
 
             # Get status icon
-            status_icon = '❓'
-            for icon, stat in self.status_icons.items():
-                if stat == task['status']:
-                    status_icon = icon
-                    break
+            status_icon = self.status_to_icon.get(task['status'], '❓')
 
             print(f"\n{i}. {status_icon} {task['title']}")
             print(f"   Category: {category}")
@@ -252,7 +258,7 @@ class TaskManager:
 
             if task['subtasks']:
                 completed = sum(
-                    1 for st in task['subtasks'] if st['completed'])
+                    done for done, _ in task['subtasks'])
                 total = len(task['subtasks'])
                 print(f"   Progress: {completed}/{total} subtasks completed")
 
@@ -127,15 +127,12 @@ def test_memory_performance():
         import time
         start_time = time.time()
 
-        # Store memories for multiple users
-        for user_id in users:
-            for i, query in enumerate(queries):
-                memory_manager.store_conversation_memory(
-                    user_id=user_id,
-                    thread_id=f"thread_{user_id}_{i}",
-                    query=query,
-                    response=f"Response to {query} for {user_id}"
-                )
+        # Store memories for multiple users, one file write per user
+        memory_manager.store_conversation_memory_bulk(
+            (user_id, f"thread_{user_id}_{i}", query,
+             f"Response to {query} for {user_id}")
+            for user_id in users
+            for i, query in enumerate(queries))
 
         storage_time = time.time() - start_time
         print(
@@ -4,107 +4,189 @@ Comprehensive memory integration test for the AI Agent application.
 Tests the full memory system functionality including API endpoints.
 """
 
-import requests
+import argparse
+import asyncio
+import aiohttp
+import contextlib
+import io
 import json
+import logging
+import orjson
+import pytest
 import time
 import sys
 import os
+from functools import lru_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from api.memory_manager import MemoryManager
+
+logger = logging.getLogger(__name__)
 
 # Server configuration
 BASE_URL = "http://localhost:8000"
 TEST_USER_ID = "integration_test_user"
 
+# Endpoint URLs
+HEALTH_URL = f"{BASE_URL}/api/health"
+AGENTS_URL = f"{BASE_URL}/api/agents"
+CHAT_URL = f"{BASE_URL}/api/chat"
+USER_PROFILE_URL = f"{BASE_URL}/api/memory/user/{TEST_USER_ID}"
+MEMORY_CLEAR_URL = f"{BASE_URL}/api/memory/clear/{TEST_USER_ID}"
+
+# Fail fast when the server is not listening, but give a slow (e.g. warming
+# up) server time to answer. Applies to every request of a session.
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(sock_connect=1.0, sock_read=10.0)
+
+# GETs that hit a gateway error while the server is (re)starting are retried
+RETRY_STATUSES = frozenset({502, 503, 504})
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.3
+
+# The server stores a conversation when the agent run ends, which can be
+# after /api/chat has answered, so the profile is polled for the update
+PROFILE_POLL_ATTEMPTS = 20
+PROFILE_POLL_INTERVAL = 0.5
 
-def test_server_health():
+
+async def _get_with_retry(session, url, **kwargs):
+    """GET a URL, waiting and retrying on transient gateway errors."""
+    for attempt in range(RETRY_ATTEMPTS):
+        response = await session.get(url, **kwargs)
+        if (response.status not in RETRY_STATUSES
+                or attempt == RETRY_ATTEMPTS - 1):
+            return response
+        response.release()
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+async def check_server_health(session):
     """Test that the server is running and responsive."""
     print("🏥 Testing server health...")
     try:
-        response = requests.get(f"{BASE_URL}/api/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Server is healthy and responsive")
-            return True
-        else:
-            print(f"❌ Server health check failed: {response.status_code}")
-            return False
-    except requests.exceptions.RequestException as e:
+        async with await _get_with_retry(session, HEALTH_URL) as response:
+            if response.status == 200:
+                print("✅ Server is healthy and responsive")
+                return True
+            else:
+                print(f"❌ Server health check failed: {response.status}")
+                return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"❌ Server health check failed: {e}")
         return False
 
 
-def test_memory_user_profile():
+async def check_memory_user_profile(session):
     """Test user profile creation and retrieval."""
     print("\n👤 Testing user profile management...")
     try:
-        response = requests.get(f"{BASE_URL}/api/memory/user/{TEST_USER_ID}")
-        if response.status_code == 200:
-            data = response.json()
-            profile = data.get('profile', {})
-            print(f"✅ User profile retrieved: {profile['user_id']}")
-            print(f"   Total interactions: {profile['total_interactions']}")
-            print(f"   Topics of interest: {profile['topics_of_interest']}")
-            return True
-        else:
-            print(f"❌ Profile retrieval failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
+        async with await _get_with_retry(session, USER_PROFILE_URL) as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                profile = data.get('profile', {})
+                print(f"✅ User profile retrieved: {profile['user_id']}")
+                print(f"   Total interactions: {profile['total_interactions']}")
+                print(f"   Topics of interest: {profile['topics_of_interest']}")
+                return True
+            else:
+                print(f"❌ Profile retrieval failed: {response.status}")
+                print(f"   Response: {await response.text()}")
+                return False
     except Exception as e:
         print(f"❌ Profile test failed: {e}")
         return False
 
 
-def test_memory_endpoints():
+async def _get_total_interactions(session):
+    """Return the test user's total_interactions as the server reports it."""
+    async with await _get_with_retry(session, USER_PROFILE_URL) as response:
+        response.raise_for_status()
+        data = orjson.loads(await response.read())
+        return data['profile']['total_interactions']
+
+
+async def check_chat_updates_profile(session):
+    """Test that a conversation posted through the API updates the profile."""
+    print("\n💬 Testing profile update after a chat...")
+    try:
+        before = await _get_total_interactions(session)
+        params = {"user_id": TEST_USER_ID,
+                  "user_query": "How do I configure Azure AI agents?"}
+        async with session.post(CHAT_URL, params=params) as response:
+            if response.status != 200:
+                print(f"❌ Chat failed: {response.status}")
+                print(f"   Response: {await response.text()}")
+                return False
+
+        for _ in range(PROFILE_POLL_ATTEMPTS):
+            after = await _get_total_interactions(session)
+            if after > before:
+                print(f"✅ Total interactions: {before} -> {after}")
+                return True
+            await asyncio.sleep(PROFILE_POLL_INTERVAL)
+
+        print(f"❌ Total interactions still {after} after the chat")
+        return False
+    except Exception as e:
+        print(f"❌ Profile update test failed: {e}")
+        return False
+
+
+async def check_memory_endpoints(session):
     """Test all memory-related API endpoints."""
     print("\n🧠 Testing memory endpoints...")
     success_count = 0
     total_tests = 2
 
-    # Test 1: User profile endpoint
-    if test_memory_user_profile():
+    # Test 1: User profile endpoint, read before the memory is cleared
+    if await check_memory_user_profile(session):
         success_count += 1
 
     # Test 2: Memory clear endpoint
     print("\n🧹 Testing memory clear...")
     try:
-        response = requests.post(f"{BASE_URL}/api/memory/clear/{TEST_USER_ID}")
-        if response.status_code == 200:
-            print("✅ Memory clear endpoint responsive")
-            success_count += 1
-        else:
-            print(f"❌ Memory clear failed: {response.status_code}")
+        async with session.post(MEMORY_CLEAR_URL) as response:
+            if response.status == 200:
+                print("✅ Memory clear endpoint responsive")
+                success_count += 1
+            else:
+                print(f"❌ Memory clear failed: {response.status}")
     except Exception as e:
         print(f"❌ Memory clear test failed: {e}")
 
     return success_count == total_tests
 
 
-def test_agent_endpoints():
+async def check_agent_endpoints(session):
     """Test agent-related endpoints."""
     print("\n🤖 Testing agent endpoints...")
 
     # Test agents list endpoint
     try:
-        response = requests.get(f"{BASE_URL}/api/agents")
-        if response.status_code == 200:
-            print("✅ Agents endpoint responsive")
-            return True
-        else:
-            print(f"❌ Agents endpoint failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
+        async with await _get_with_retry(session, AGENTS_URL) as response:
+            if response.status == 200:
+                print("✅ Agents endpoint responsive")
+                return True
+            else:
+                print(f"❌ Agents endpoint failed: {response.status}")
+                print(f"   Response: {await response.text()}")
+                return False
     except Exception as e:
         print(f"❌ Agents test failed: {e}")
         return False
 
 
-def simulate_memory_storage():
+@lru_cache(maxsize=1)
+def _get_memory_manager():
+    """Create the memory manager once and share it between the tests."""
+    return MemoryManager()
+
+
+def simulate_memory_storage(memory_manager=None):
     """Simulate memory storage by directly using the memory manager."""
     print("\n💾 Testing direct memory storage...")
     try:
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-        from api.memory_manager import MemoryManager
-
-        # Initialize memory manager
-        memory_manager = MemoryManager()
+        memory_manager = memory_manager or _get_memory_manager()
 
         # Store some test conversations
         test_conversations = [
@@ -122,13 +204,10 @@ def simulate_memory_storage():
             }
         ]
 
-        for i, conv in enumerate(test_conversations):
-            memory_manager.store_conversation_memory(
-                user_id=TEST_USER_ID,
-                thread_id=f"test_thread_{i}",
-                query=conv["query"],
-                response=conv["response"]
-            )
+        # Store all conversations with one read and write of the memory file
+        memory_manager.store_conversation_memory_bulk(
+            (TEST_USER_ID, f"test_thread_{i}", conv["query"], conv["response"])
+            for i, conv in enumerate(test_conversations))
 
         print(f"✅ Stored {len(test_conversations)} test conversations")
 
@@ -144,21 +223,16 @@ def simulate_memory_storage():
 
         return len(relevant_memories) > 0
 
-    except Exception as e:
-        print(f"❌ Memory storage test failed: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ Memory storage test failed")
         return False
 
 
-def test_memory_context_formatting():
+def check_memory_context_formatting(memory_manager=None):
     """Test memory context formatting for agents."""
     print("\n📝 Testing memory context formatting...")
     try:
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-        from api.memory_manager import MemoryManager
-
-        memory_manager = MemoryManager()
+        memory_manager = memory_manager or _get_memory_manager()
 
         # Format context for agent
         context = memory_manager.format_context_for_agent(
@@ -180,43 +254,80 @@ def test_memory_context_formatting():
         return False
 
 
-def run_comprehensive_memory_test():
-    """Run all memory integration tests."""
-    print("🧪 Starting Comprehensive Memory Integration Test")
-    print("=" * 55)
+async def run_memory_tests(session, fail_fast=False):
+    """Run the memory tests in order and return how many passed.
 
-    start_time = time.time()
+    With fail_fast, the profile re-test is skipped when storage failed.
+    """
     passed_tests = 0
-    total_tests = 6
 
-    # Test 1: Server health
-    if test_server_health():
-        passed_tests += 1
-
-    # Test 2: Memory endpoints
-    if test_memory_endpoints():
-        passed_tests += 1
-
-    # Test 3: Agent endpoints
-    if test_agent_endpoints():
+    # Test 2: Memory endpoints, which clear the memory before it is stored
+    if await check_memory_endpoints(session):
         passed_tests += 1
 
+    # Tests 4 and 5 use the memory manager directly. They run in a worker
+    # thread so the event loop keeps serving the concurrent HTTP tests.
     # Test 4: Direct memory storage
-    if simulate_memory_storage():
+    stored = await asyncio.to_thread(simulate_memory_storage)
+    if stored:
         passed_tests += 1
 
     # Test 5: Memory context formatting
-    if test_memory_context_formatting():
+    if await asyncio.to_thread(check_memory_context_formatting):
         passed_tests += 1
 
     # Test 6: Re-test memory endpoints after storage
+    if fail_fast and not stored:
+        print("\n⏭️  Skipping the profile re-test: memory storage failed")
+        return passed_tests
+
     print("\n🔄 Re-testing memory endpoints after storage...")
-    if test_memory_user_profile():
+    if await check_memory_user_profile(session):
         passed_tests += 1
 
+    return passed_tests
+
+
+async def run_comprehensive_memory_test(fail_fast=False):
+    """Run all memory integration tests.
+
+    With fail_fast, the run aborts with exit status 2 when the server is not
+    healthy, since every HTTP test would fail after it.
+    """
+    print("🧪 Starting Comprehensive Memory Integration Test")
+    print("=" * 55)
+
+    start_ns = time.perf_counter_ns()
+    passed_tests = 0
+    total_tests = 6
+
+    # One pooled session is shared by every HTTP test
+    async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20),
+            timeout=REQUEST_TIMEOUT) as session:
+        # Test 1: Server health, checked up front when failing fast
+        health_checks = []
+        if fail_fast:
+            if not await check_server_health(session):
+                print("\n⛔ Server is down, aborting.")
+                sys.exit(2)
+            passed_tests += 1
+        else:
+            health_checks.append(check_server_health(session))
+
+        # Tests 1 and 3 (server health, agent endpoints) do not depend on the
+        # memory tests, so they run while the memory tests are in progress
+        results = await asyncio.gather(
+            *health_checks,
+            check_agent_endpoints(session),
+            run_memory_tests(session, fail_fast),
+            return_exceptions=True)
+        # Booleans from single tests, a count from the memory tests
+        passed_tests += sum(result for result in results
+                            if isinstance(result, int))
+
     # Summary
-    end_time = time.time()
-    duration = end_time - start_time
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
 
     print("\n" + "=" * 55)
     print(f"📊 Test Results Summary")
@@ -233,6 +344,63 @@ def run_comprehensive_memory_test():
         return False
 
 
+async def _with_session(check):
+    """Run one HTTP check with its own client session."""
+    async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
+        return await check(session)
+
+
+# Pytest entry points. The harness above runs the same checks concurrently
+# when this file is executed as a script.
+@pytest.fixture(scope="module")
+def server():
+    """Skip the HTTP tests when no healthy server is listening."""
+    if not asyncio.run(_with_session(check_server_health)):
+        pytest.skip(f"No healthy server at {BASE_URL}")
+
+
+def test_memory_endpoints(server):
+    assert asyncio.run(_with_session(check_memory_endpoints))
+
+
+def test_agent_endpoints(server):
+    assert asyncio.run(_with_session(check_agent_endpoints))
+
+
+@pytest.fixture(scope="module")
+def memory_manager(tmp_path_factory):
+    """A memory manager that stores into a temporary directory, not src/data."""
+    return MemoryManager(storage_path=str(tmp_path_factory.mktemp("memory")))
+
+
+def test_memory_storage(memory_manager):
+    assert simulate_memory_storage(memory_manager)
+
+
+def test_memory_context_formatting(memory_manager):
+    assert check_memory_context_formatting(memory_manager)
+
+
+def test_memory_user_profile_after_storage(server):
+    assert asyncio.run(_with_session(check_chat_updates_profile))
+
+
 if __name__ == "__main__":
-    success = run_comprehensive_memory_test()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fail-fast", action="store_true",
+        help="abort when the server is down and skip tests that need "
+             "data a failed test should have stored")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Collect the report in memory and write it out once at the end,
+    # including when --fail-fast aborts the run
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            success = asyncio.run(run_comprehensive_memory_test(args.fail_fast))
+    finally:
+        sys.stdout.write(output.getvalue())
+        sys.stdout.flush()
     sys.exit(0 if success else 1)